@@ -23,3 +23,7 @@ PY
 fi
 
 python manage.py collectstatic --noinput
+
+# Pre-render the date-based API payloads as static files (served with immutable
+# caching, so these dates never reach the Python function).
+python manage.py export_ephemeris --days "${EPHEMERIS_EXPORT_DAYS:-730}"
@@ -0,0 +1,57 @@
+"""Bundled bright-star catalog.
+
+data/bright_stars.csv is the editable source; ``manage.py build_star_catalog``
+turns it into data/bright_stars.npy, a structured array that is
+memory-mapped read-only on first use, so worker processes share the pages
+and nothing is parsed at startup.
+"""
+import csv
+from pathlib import Path
+
+import numpy as np
+from skyfield.api import Star
+from skyfield.units import Angle
+
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+CSV_PATH = DATA_DIR / 'bright_stars.csv'
+NPY_PATH = DATA_DIR / 'bright_stars.npy'
+
+DTYPE = np.dtype([('name', 'U24'), ('ra_deg', '<f8'), ('dec_deg', '<f8'), ('vmag', '<f4')])
+
+_catalog = None
+
+
+def read_csv(path: Path = CSV_PATH) -> np.ndarray:
+    with path.open(encoding='utf-8', newline='') as f:
+        rows = csv.DictReader(line for line in f if not line.startswith('#'))
+        stars = [(r['name'], float(r['ra_deg']), float(r['dec_deg']), float(r['vmag'])) for r in rows]
+    stars.sort(key=lambda s: s[3])
+    return np.array(stars, dtype=DTYPE)
+
+
+def write_npy(stars: np.ndarray, path: Path = NPY_PATH):
+    np.save(path, stars.astype(DTYPE), allow_pickle=False)
+
+
+def catalog() -> np.ndarray:
+    """All stars, brightest first (read-only)."""
+    global _catalog
+    if _catalog is None:
+        if NPY_PATH.exists():
+            _catalog = np.load(NPY_PATH, mmap_mode='r', allow_pickle=False)
+        else:
+            _catalog = read_csv()
+    return _catalog
+
+
+def apparent_radec(earth, t, stars: np.ndarray):
+    """Geocentric apparent RA/Dec of date in degrees for every star at ``t``.
+
+    One Skyfield call for the whole catalog: a Star built from arrays is
+    observed as a vector.
+    """
+    star = Star(ra=Angle(degrees=np.asarray(stars['ra_deg'])),
+                dec=Angle(degrees=np.asarray(stars['dec_deg'])))
+    ra, dec, _ = earth.at(t).observe(star).apparent().radec(epoch='date')
+    return ra._degrees, dec.degrees
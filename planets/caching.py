@@ -0,0 +1,172 @@
+"""Tiered cache for expensive results (ephemeris tables, moon phases, comets, space weather).
+
+Lookups go to a small in-process LRU first and then to the Django cache
+configured in CACHES, which is meant to be shared between instances (a
+file-based store or a Redis-compatible server, chosen with PLANETS_CACHE_URL).
+Values are stored compactly: JSON (orjson when available), zlib-compressed
+when large, and NumPy arrays in .npy format. Keys include the ephemeris
+version (both kernels: the orbit ephemeris and the one planets_distance
+loads), so shipping a different ephemeris file invalidates everything.
+
+Misses go through planets.singleflight, so one cold key is computed once
+even under concurrent load. Cached values are shared between requests; treat
+them as read-only.
+"""
+import hashlib
+import io
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from . import encoding, ephemeris
+from .singleflight import single_flight_polling
+
+
+FORMAT_VERSION = 1
+_COMPRESS_OVER = 1024
+
+_TAG_JSON = b'j'
+_TAG_ZJSON = b'z'
+_TAG_NUMPY = b'n'
+
+_MISSING = object()
+
+
+def dumps_value(value) -> bytes:
+    if isinstance(value, np.ndarray):
+        buf = io.BytesIO()
+        np.save(buf, value, allow_pickle=False)
+        return _TAG_NUMPY + zlib.compress(buf.getvalue(), 6)
+    raw = encoding.dumps_json_bytes(value)
+    if len(raw) > _COMPRESS_OVER:
+        return _TAG_ZJSON + zlib.compress(raw, 6)
+    return _TAG_JSON + raw
+
+
+def loads_value(data: bytes):
+    tag, body = data[:1], data[1:]
+    if tag == _TAG_JSON:
+        return json.loads(body)
+    if tag == _TAG_ZJSON:
+        return json.loads(zlib.decompress(body))
+    if tag == _TAG_NUMPY:
+        return np.load(io.BytesIO(zlib.decompress(body)), allow_pickle=False)
+    raise ValueError('unknown cache value encoding')
+
+
+_version = None
+
+
+def ephemeris_version() -> str:
+    """Identifies the kernels in use (file name, size and mtime of each)."""
+    global _version
+    if _version is None:
+        ident = '|'.join((
+            ephemeris.kernel_identity(ephemeris.ephemeris_path(), 'de421-download'),
+            ephemeris.kernel_identity(ephemeris.distance_kernel_path(), f'{ephemeris.DISTANCE_KERNEL}-download'),
+        ))
+        _version = hashlib.sha1(f'{FORMAT_VERSION}:{ident}'.encode('utf-8')).hexdigest()[:10]
+    return _version
+
+
+class _LocalLRU:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    def __init__(self, alias='default', local_size=None, local_ttl=None):
+        self.alias = alias
+        self.local = _LocalLRU(local_size or getattr(settings, 'PLANETS_CACHE_LOCAL_SIZE', 256))
+        # The local tier never outlives this, so instances converge on the shared value.
+        self.local_ttl = local_ttl or getattr(settings, 'PLANETS_CACHE_LOCAL_TTL', 300)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f'planets:{ephemeris_version()}:{namespace}:{key}'
+
+    def _local_timeout(self, timeout):
+        return self.local_ttl if timeout is None else min(timeout, self.local_ttl)
+
+    def get(self, namespace: str, key: str, default=None):
+        full_key = self._key(namespace, key)
+        value = self.local.get(full_key)
+        if value is not _MISSING:
+            return value
+        try:
+            data = caches[self.alias].get(full_key)
+        except Exception:
+            data = None
+        if data is None:
+            return default
+        try:
+            value = loads_value(data)
+        except Exception:
+            return default
+        self.local.set(full_key, value, self.local_ttl)
+        return value
+
+    def set(self, namespace: str, key: str, value, timeout=None):
+        """Store ``value``; ``timeout`` is in seconds (None = backend default)."""
+        full_key = self._key(namespace, key)
+        self.local.set(full_key, value, self._local_timeout(timeout))
+        try:
+            caches[self.alias].set(full_key, dumps_value(value), timeout)
+        except Exception:
+            pass
+
+    def get_or_compute(self, namespace: str, key: str, fn, *args, timeout=None, **kwargs):
+        """Return the cached value or compute it once (single-flight) and cache it.
+
+        ``timeout`` may be a callable taking the result, e.g. to keep failures
+        only briefly.
+        """
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def compute():
+            result = fn(*args, **kwargs)
+            self.set(namespace, key, result, timeout(result) if callable(timeout) else timeout)
+            return result
+
+        def poll():
+            # Waiters (in this or another process) pick up what the leader stored.
+            cached = self.get(namespace, key, _MISSING)
+            return cached is not _MISSING, cached
+
+        return single_flight_polling(self._key(namespace, key), compute, poll)
+
+
+tiered_cache = TieredCache()
@@ -0,0 +1,166 @@
+"""Response encodings for the planets API views.
+
+``dumps_json``/``FastJsonResponse`` serialize with orjson when it is installed
+and fall back to the stdlib encoder otherwise.
+
+For the orbit position API JSON stays the default. Clients that send a
+matching ``Accept`` header (or ``?format=``) can ask for a compact encoding
+instead:
+
+* ``application/x-planets-positions`` – a packed little-endian buffer:
+
+    header   '<4sHHIiI'  magic b'PPOS', version, n_bodies, n_frames,
+                         first frame as days since 1970-01-01, step in days
+    names    uint16 byte length + comma separated ASCII body names
+    radii    float32[n_bodies]             schematic orbit radii
+    angles   float32[n_frames][n_bodies]   heliocentric angles (radians)
+
+* ``application/msgpack`` – the JSON payload as MessagePack (only when the
+  optional ``msgpack`` package is installed).
+"""
+import json
+import struct
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except Exception:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+
+JSON_CONTENT_TYPE = 'application/json'
+PACKED_CONTENT_TYPE = 'application/x-planets-positions'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+PACKED_MAGIC = b'PPOS'
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct('<4sHHIiI')
+
+_FORMAT_ALIASES = {
+    'json': JSON_CONTENT_TYPE,
+    'bin': PACKED_CONTENT_TYPE,
+    'packed': PACKED_CONTENT_TYPE,
+    'msgpack': MSGPACK_CONTENT_TYPE,
+}
+
+_EPOCH = date(1970, 1, 1)
+
+
+class _NumpyJSONEncoder(DjangoJSONEncoder):
+    """Stdlib fallback that also understands NumPy scalars and arrays."""
+
+    def default(self, o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return super().default(o)
+
+
+def _orjson_default(o):
+    # orjson handles datetimes and NumPy natively; cover what DjangoJSONEncoder adds.
+    return _NumpyJSONEncoder().default(o)
+
+
+def dumps_json_bytes(data) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data,
+            default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(data, cls=_NumpyJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_json(data) -> str:
+    """Serialize ``data`` to a JSON string (used for JSON embedded in templates)."""
+    return dumps_json_bytes(data).decode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in for JsonResponse (dict payloads) backed by ``dumps_json_bytes``."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', JSON_CONTENT_TYPE)
+        super().__init__(content=dumps_json_bytes(data), **kwargs)
+
+
+def available_content_types():
+    """Content types this server can produce, JSON first (the default)."""
+    types = [JSON_CONTENT_TYPE, PACKED_CONTENT_TYPE]
+    if MSGPACK_AVAILABLE:
+        types.append(MSGPACK_CONTENT_TYPE)
+    return types
+
+
+def negotiate_content_type(request):
+    """Pick the response content type from ``?format=`` or the Accept header.
+
+    Anything unknown or unavailable falls back to JSON.
+    """
+    available = available_content_types()
+    fmt = (request.GET.get('format') or '').strip().lower()
+    if fmt:
+        chosen = _FORMAT_ALIASES.get(fmt)
+        return chosen if chosen in available else JSON_CONTENT_TYPE
+    return request.get_preferred_type(available) or JSON_CONTENT_TYPE
+
+
+def pack_positions(names, radii, angles, start: date, step_days: int = 1) -> bytes:
+    """Encode a (n_frames, n_bodies) angle table in the packed format."""
+    angles = np.asarray(angles, dtype='<f4')
+    if angles.ndim == 1:
+        angles = angles[np.newaxis, :]
+    n_frames, n_bodies = angles.shape
+    if n_bodies != len(names) or n_bodies != len(radii):
+        raise ValueError('names, radii and angles disagree on the number of bodies')
+    if isinstance(start, datetime):
+        start = start.date()
+    name_bytes = ','.join(names).encode('ascii')
+    return b''.join((
+        PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, n_bodies, n_frames,
+                           (start - _EPOCH).days, step_days),
+        struct.pack('<H', len(name_bytes)),
+        name_bytes,
+        np.asarray(radii, dtype='<f4').tobytes(),
+        angles.tobytes(),
+    ))
+
+
+def unpack_positions(data: bytes) -> dict:
+    """Decode a packed buffer back into plain Python structures."""
+    magic, version, n_bodies, n_frames, start_days, step_days = PACKED_HEADER.unpack_from(data, 0)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError('not a packed positions buffer')
+    offset = PACKED_HEADER.size
+    (name_len,) = struct.unpack_from('<H', data, offset)
+    offset += 2
+    names = data[offset:offset + name_len].decode('ascii').split(',')
+    offset += name_len
+    radii = np.frombuffer(data, dtype='<f4', count=n_bodies, offset=offset)
+    offset += radii.nbytes
+    angles = np.frombuffer(data, dtype='<f4', count=n_frames * n_bodies, offset=offset)
+    start = _EPOCH + timedelta(days=start_days)
+    return {
+        'names': names,
+        'radii': radii.tolist(),
+        'dates': [(start + timedelta(days=i * step_days)).strftime('%Y-%m-%d') for i in range(n_frames)],
+        'angles': angles.reshape(n_frames, n_bodies).tolist(),
+    }
+
+
+def encode_msgpack(payload) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True, use_single_float=True)
@@ -0,0 +1,35 @@
+"""Where the JPL kernels the app computes from live.
+
+Kept apart from the views so lower layers (planets.caching) can identify the
+ephemeris without importing them.
+"""
+from pathlib import Path
+
+from django.conf import settings
+from skyfield.api import load
+
+
+# Loaded by planets.planets_distance (observer distances, series and matrices).
+DISTANCE_KERNEL = 'de440.bsp'
+
+
+def ephemeris_path():
+    """The ephemeris file shipped with this project, or None if absent."""
+    base_dir = Path(getattr(settings, 'BASE_DIR', Path.cwd()))
+    for name in ('de421.bsp', 'de440.bsp'):
+        eph_path = base_dir / name
+        if eph_path.exists():
+            return eph_path
+    return None
+
+
+def distance_kernel_path() -> Path:
+    return Path(load.path_to(DISTANCE_KERNEL))
+
+
+def kernel_identity(path, fallback: str) -> str:
+    """File name, size and mtime of a kernel (``fallback`` if it is missing)."""
+    if path is None or not Path(path).exists():
+        return fallback
+    stat = Path(path).stat()
+    return f'{Path(path).name}:{stat.st_size}:{int(stat.st_mtime)}'
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from planets import bright_stars
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert the bright-star CSV (planets/data/bright_stars.csv) into the '
+        'memory-mapped .npy catalog used by /api/sky/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(bright_stars.CSV_PATH))
+        parser.add_argument('--output', default=str(bright_stars.NPY_PATH))
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        try:
+            stars = bright_stars.read_csv(source)
+        except (OSError, KeyError, ValueError) as e:
+            raise CommandError(f'Could not read {source}: {e}')
+        if not len(stars):
+            raise CommandError(f'{source} has no stars.')
+        bright_stars.write_npy(stars, Path(options['output']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(stars)} stars (V {stars["vmag"].min():.2f} to {stars["vmag"].max():.2f}) '
+            f'to {options["output"]}'
+        ))
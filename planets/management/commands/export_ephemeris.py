@@ -0,0 +1,152 @@
+import hashlib
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from skyfield.api import utc
+
+from planets import encoding
+
+
+# Bump when the exported payload layout changes.
+EXPORT_FORMAT = 1
+
+EXPORT_DIRNAME = 'ephemeris'
+
+
+def export_version(chunk_digests) -> str:
+    """Short content version for the exported tree.
+
+    Files live under ``ephemeris/<version>/`` so they can be cached as immutable;
+    the version is a hash of every exported file (path and bytes), so any change
+    to the ephemeris, the facts or the payload builders yields new URLs.
+    """
+    digest = hashlib.sha1(f'format:{EXPORT_FORMAT}'.encode('utf-8'))
+    for chunk_digest in chunk_digests:
+        digest.update(chunk_digest.encode('ascii'))
+    return digest.hexdigest()[:12]
+
+
+def _init_worker():
+    # Spawned workers (macOS/Windows) start without Django configured.
+    django.setup()
+
+
+def _export_chunk(out_dir: str, dates: list):
+    """Write the orbit-positions and planet-info payloads for ``dates``.
+
+    Every planet is evaluated for the whole chunk in one vectorized call.
+    Returns (files written, hex digest of their paths and contents).
+    """
+    from planets import views
+
+    out = Path(out_dir)
+    ts, bodies = views._get_skyfield()
+    angles = views._heliocentric_angles(ts, bodies, dates)
+    ref_angles = views._heliocentric_angles(ts, bodies, [views.J2000_DATE])[0]
+    radii = views._schematic_radii()
+
+    digest = hashlib.sha1()
+    written = 0
+    for day, row in zip(dates, angles):
+        stamp = day.strftime('%Y-%m-%d')
+        _write_json(out, f'orbit-positions/{stamp}.json',
+                    views._orbit_positions_payload(day, radii, row), digest)
+        written += 1
+        for planet_id, facts in views.PLANET_FACTS.items():
+            if planet_id in views.PLANET_ORDER and facts.get('year_length_earth_days') is not None:
+                i = views.PLANET_ORDER.index(planet_id)
+                year_progress = views._year_progress(float(row[i]), float(ref_angles[i]))
+            else:
+                year_progress = 0.0
+            _write_json(out, f'planet-info/{planet_id}/{stamp}.json',
+                        views._planet_info_payload(planet_id, day, year_progress), digest)
+            written += 1
+    return written, digest.hexdigest()
+
+
+def _write_json(root: Path, rel_path: str, payload, digest=None):
+    data = encoding.dumps_json_bytes(payload)
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    if digest is not None:
+        digest.update(rel_path.encode('utf-8') + b'\0' + data + b'\0')
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-render orbit-positions and planet-info API payloads for a date range '
+        'as static JSON under STATIC_ROOT/ephemeris/ (served by whitenoise/CDN).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date (YYYY-MM-DD). Defaults to today (UTC).')
+        parser.add_argument('--end', help='Last date, inclusive (YYYY-MM-DD). Overrides --days.')
+        parser.add_argument('--days', type=int, default=365, help='Number of days to export (default: 365).')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count).')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days per worker task (default: 31).')
+        parser.add_argument('--output', help='Output directory (default: STATIC_ROOT/ephemeris).')
+
+    def handle(self, *args, **options):
+        try:
+            start = self._parse_date(options['start']) if options['start'] else \
+                datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=utc)
+            if options['end']:
+                end = self._parse_date(options['end'])
+            else:
+                end = start + timedelta(days=options['days'] - 1)
+        except ValueError:
+            raise CommandError('Dates must use YYYY-MM-DD.')
+        if end < start:
+            raise CommandError('--end must not be before --start.')
+
+        root = Path(options['output'] or Path(settings.STATIC_ROOT) / EXPORT_DIRNAME)
+        # Render into a staging directory first: the version is only known once
+        # every file has been hashed.
+        staging = root / f'.staging-{uuid.uuid4().hex[:8]}'
+
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        chunk = max(1, options['chunk_days'])
+        chunks = [dates[i:i + chunk] for i in range(0, len(dates), chunk)]
+
+        try:
+            if options['workers'] == 1 or len(chunks) == 1:
+                results = [_export_chunk(str(staging), part) for part in chunks]
+            else:
+                with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                    results = list(pool.map(_export_chunk, [str(staging)] * len(chunks), chunks))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        written = sum(count for count, _ in results)
+        version = export_version([chunk_digest for _, chunk_digest in results])
+        out_dir = root / version
+        if out_dir.exists():
+            # Same content was exported before; its files are already in place.
+            shutil.rmtree(staging)
+        else:
+            staging.rename(out_dir)
+
+        # The index is the only mutable file: the frontend reads it to find the
+        # current version and the exported range.
+        index = {
+            'version': version,
+            'start': start.strftime('%Y-%m-%d'),
+            'end': end.strftime('%Y-%m-%d'),
+            'generated_at_utc': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        _write_json(root, 'index.json', index)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {written} files for {len(dates)} days ({index["start"]}..{index["end"]}) to {out_dir}'
+        ))
+
+    @staticmethod
+    def _parse_date(value: str):
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=utc)
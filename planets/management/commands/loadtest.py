@@ -0,0 +1,247 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PLANET_IDS = ['mercury', 'venus', 'earth', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune', 'sun']
+
+# Default traffic mix (relative weights), roughly what the orbits page generates.
+DEFAULT_MIX = {
+    '/': 1,
+    '/api/orbit-positions/': 4,
+    '/api/planet-info/': 3,
+    '/api/space-weather/': 1,
+}
+
+
+def _parse_mix(text: str):
+    mix = {}
+    for part in text.split(','):
+        path, sep, weight = part.strip().rpartition('=')
+        if not sep or not path:
+            raise CommandError(f'Bad --mix entry {part!r}; use PATH=WEIGHT.')
+        try:
+            mix[path] = float(weight)
+        except ValueError:
+            raise CommandError(f'Bad --mix weight in {part!r}; WEIGHT must be a number.')
+    return mix
+
+
+def _synthetic_request(path: str, rng: random.Random) -> str:
+    """Fill in realistic query parameters for the known endpoints."""
+    day = (datetime.utcnow() + timedelta(days=rng.randint(-365, 365))).strftime('%Y-%m-%d')
+    if path == '/api/orbit-positions/':
+        return f'{path}?date={day}'
+    if path == '/api/planet-info/':
+        return f'{path}?planet={rng.choice(PLANET_IDS)}&date={day}'
+    return path
+
+
+def _load_replay(path: Path):
+    """Read a captured traffic log: one JSON object per line with ``path``
+    (or ``url``) and an optional ``offset`` in seconds from the start."""
+    entries = []
+    with path.open(encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                target = item.get('path') or item['url']
+                if not isinstance(target, str):
+                    raise TypeError(target)
+                offset = float(item.get('offset', 0.0))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise CommandError(f'{path}:{lineno}: expected a JSON object with "path".')
+            parts = urlsplit(target)
+            target = parts.path + (f'?{parts.query}' if parts.query else '')
+            entries.append((offset, target))
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+def _endpoint(target: str) -> str:
+    return target.split('?', 1)[0]
+
+
+class _Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, endpoint, latency, ok, status):
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((latency, ok, status))
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server with a weighted mix of page/API requests (or a replayed '
+        'JSONL traffic log) and report throughput, latency percentiles and error rates '
+        'per endpoint. Use --spawn-server to start a local server that answers upstream '
+        'calls from fixtures (PLANETS_UPSTREAM_MODE=replay), so the run works offline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', default='1,8,32',
+                            help='Comma separated concurrency levels, run one after another.')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds per concurrency level (mix mode).')
+        parser.add_argument('--mix', help='PATH=WEIGHT,... (default: %s)' % ','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()))
+        parser.add_argument('--replay', help='JSONL traffic log to replay instead of the synthetic mix.')
+        parser.add_argument('--replay-speed', type=float, default=0.0,
+                            help='Honour log offsets at this speed-up (0 = as fast as possible).')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--json-report', help='Also write the results as JSON to this file.')
+        parser.add_argument('--spawn-server', action='store_true',
+                            help='Start `runserver` on --base-url for the duration of the run.')
+        parser.add_argument('--upstream-mode', default='replay',
+                            help='PLANETS_UPSTREAM_MODE for the spawned server (default: replay).')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(c) for c in options['concurrency'].split(',') if c.strip()]
+        except ValueError:
+            raise CommandError('--concurrency must be a comma separated list of integers.')
+        if not levels or min(levels) < 1:
+            raise CommandError('--concurrency levels must be >= 1.')
+
+        replay = _load_replay(Path(options['replay'])) if options['replay'] else None
+        mix = _parse_mix(options['mix']) if options['mix'] else DEFAULT_MIX
+        base_url = options['base_url'].rstrip('/')
+
+        server = self._spawn_server(base_url, options['upstream_mode']) if options['spawn_server'] else None
+        try:
+            report = []
+            for level in levels:
+                rng = random.Random(options['seed'])
+                recorder, elapsed = self._run_level(base_url, level, mix, replay, rng, options)
+                summary = self._summarize(recorder, elapsed)
+                report.append({'concurrency': level, 'elapsed_s': elapsed, 'endpoints': summary})
+                self._print_level(level, elapsed, summary)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        if options['json_report']:
+            Path(options['json_report']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    def _run_level(self, base_url, concurrency, mix, replay, rng, options):
+        recorder = _Recorder()
+        timeout = options['timeout']
+        speed = options['replay_speed']
+        paths, weights = list(mix), list(mix.values())
+        lock = threading.Lock()
+        replay_iter = iter(replay) if replay is not None else None
+        start = time.perf_counter()
+        stop_at = start + options['duration']
+
+        def next_target():
+            with lock:
+                if replay_iter is not None:
+                    entry = next(replay_iter, None)
+                    if entry is None:
+                        return None
+                    offset, target = entry
+                    if speed > 0:
+                        wait = start + offset / speed - time.perf_counter()
+                        if wait > 0:
+                            time.sleep(wait)
+                    return target
+                if time.perf_counter() >= stop_at:
+                    return None
+                return _synthetic_request(rng.choices(paths, weights)[0], rng)
+
+        def worker():
+            while True:
+                target = next_target()
+                if target is None:
+                    return
+                t0 = time.perf_counter()
+                ok, status = False, None
+                try:
+                    req = urllib.request.Request(base_url + target, headers={'Accept-Encoding': 'gzip'})
+                    with urllib.request.urlopen(req, timeout=timeout) as resp:
+                        resp.read()
+                        status = resp.status
+                        ok = 200 <= status < 400
+                except urllib.error.HTTPError as e:
+                    status = e.code
+                except Exception:
+                    status = None
+                recorder.add(_endpoint(target), time.perf_counter() - t0, ok, status)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        return recorder, time.perf_counter() - start
+
+    @staticmethod
+    def _summarize(recorder, elapsed):
+        summary = {}
+        rows = list(recorder.samples.items())
+        everything = [s for _, samples in rows for s in samples]
+        if everything:
+            rows.append(('TOTAL', everything))
+        for endpoint, samples in rows:
+            latencies = np.array([s[0] for s in samples]) * 1000.0
+            errors = sum(1 for s in samples if not s[1])
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            summary[endpoint] = {
+                'requests': len(samples),
+                'throughput_rps': len(samples) / elapsed if elapsed > 0 else 0.0,
+                'errors': errors,
+                'error_rate': errors / len(samples),
+                'p50_ms': float(p50),
+                'p90_ms': float(p90),
+                'p99_ms': float(p99),
+                'max_ms': float(latencies.max()),
+            }
+        return summary
+
+    def _print_level(self, level, elapsed, summary):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\nConcurrency {level} ({elapsed:.1f}s)'))
+        header = f'{"endpoint":<28}{"reqs":>7}{"req/s":>9}{"err%":>7}{"p50ms":>9}{"p90ms":>9}{"p99ms":>9}{"maxms":>9}'
+        self.stdout.write(header)
+        for endpoint, s in summary.items():
+            self.stdout.write(
+                f'{endpoint:<28}{s["requests"]:>7}{s["throughput_rps"]:>9.1f}{s["error_rate"] * 100:>7.1f}'
+                f'{s["p50_ms"]:>9.1f}{s["p90_ms"]:>9.1f}{s["p99_ms"]:>9.1f}{s["max_ms"]:>9.1f}'
+            )
+
+    def _spawn_server(self, base_url, upstream_mode):
+        parts = urlsplit(base_url)
+        addr = f'{parts.hostname or "127.0.0.1"}:{parts.port or 8000}'
+        env = dict(os.environ, PLANETS_UPSTREAM_MODE=upstream_mode)
+        manage_py = Path(settings.BASE_DIR) / 'manage.py'
+        proc = subprocess.Popen([sys.executable, str(manage_py), 'runserver', '--noreload', addr], env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(base_url + '/api/space-weather/', timeout=5):
+                    return proc
+            except urllib.error.HTTPError:
+                return proc
+            except Exception:
+                if proc.poll() is not None:
+                    break
+                time.sleep(0.5)
+        proc.terminate()
+        raise CommandError(f'Could not start a server on {addr}.')
@@ -0,0 +1,17 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from planets import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'Print a signed token for the X-Planets-Profile header (profiles that request) '
+        'and for listing /api/profiles/ (send it in the same header). Needs PLANETS_PROFILER_SECRET.'
+    )
+
+    def handle(self, *args, **options):
+        try:
+            self.stdout.write(profiling.make_token())
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
@@ -0,0 +1,130 @@
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from planets import upstream
+
+
+_PATH_RE = re.compile(r'^/(?P<kind>[a-z]+)/(?P<key>[0-9a-f]+)$')
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures: Path, latency_ms=0.0, jitter_ms=0.0,
+                 failure_rate=0.0, hang_rate=0.0, hang_seconds=30.0, seed=None):
+        super().__init__(address, StandinHandler)
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = {'served': 0, 'missing': 0, 'failed': 0, 'hung': 0}
+
+    def draw(self):
+        with self.random_lock:
+            return self.random.random(), self.random.random(), self.random.uniform(-1.0, 1.0)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serve recorded upstream fixtures with injected latency and failures."""
+
+    server_version = 'planets-upstream-standin'
+
+    def do_GET(self):
+        server = self.server
+        match = _PATH_RE.match(self.path)
+        if not match:
+            return self._reply(404, b'{"error": "unknown path"}')
+
+        fail_roll, hang_roll, jitter = server.draw()
+        delay = max(0.0, server.latency_ms + jitter * server.jitter_ms) / 1000.0
+        if hang_roll < server.hang_rate:
+            # Longer than any client timeout: exercises the timeout paths.
+            server.stats['hung'] += 1
+            time.sleep(server.hang_seconds)
+        elif delay:
+            time.sleep(delay)
+
+        if fail_roll < server.failure_rate:
+            server.stats['failed'] += 1
+            return self._reply(503, b'{"error": "injected failure"}')
+
+        path = server.fixtures / match['kind'] / f'{match["key"]}.json'
+        if not path.is_file():
+            server.stats['missing'] += 1
+            return self._reply(404, b'{"error": "no fixture"}')
+        server.stats['served'] += 1
+        return self._reply(200, path.read_bytes())
+
+    def _reply(self, status, body: bytes):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out and went away.
+            pass
+
+    def log_message(self, format, *args):
+        if getattr(self.server, 'verbose', False):
+            super().log_message(format, *args)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local stand-in for NOAA/SBDB/Horizons that serves recorded fixtures '
+        '(see planets.upstream) with configurable latency and failures. Point the app '
+        'at it with PLANETS_UPSTREAM_MODE=standin.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixtures', help='Fixture directory (default: PLANETS_UPSTREAM_FIXTURES).')
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Base delay added to every response.')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform +/- jitter around the base delay.')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503.')
+        parser.add_argument('--hang-rate', type=float, default=0.0,
+                            help='Fraction of requests that stall for --hang-seconds (client timeouts).')
+        parser.add_argument('--hang-seconds', type=float, default=30.0)
+        parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible failure injection.')
+
+    def handle(self, *args, **options):
+        fixtures = Path(options['fixtures']) if options['fixtures'] else upstream.fixtures_dir()
+        if not fixtures.is_dir():
+            raise CommandError(f'Fixture directory {fixtures} does not exist; record some with PLANETS_UPSTREAM_MODE=record.')
+        for name in ('failure_rate', 'hang_rate'):
+            if not 0.0 <= options[name] <= 1.0:
+                raise CommandError(f'--{name.replace("_", "-")} must be between 0 and 1.')
+
+        server = StandinServer(
+            (options['host'], options['port']),
+            fixtures,
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            failure_rate=options['failure_rate'],
+            hang_rate=options['hang_rate'],
+            hang_seconds=options['hang_seconds'],
+            seed=options['seed'],
+        )
+        server.verbose = options['verbosity'] > 1
+        host, port = server.server_address[:2]
+        self.stdout.write(f'Serving upstream fixtures from {fixtures} on http://{host}:{port}/ (Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Stand-in stats: {server.stats}')
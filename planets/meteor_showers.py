@@ -0,0 +1,192 @@
+"""Meteor shower catalog, next-peak index and radiant visibility.
+
+The catalog is bundled (IMO working list of the major night-time showers):
+activity window, peak, ZHR and radiant at the peak. Dates repeat every year
+to within a day, which is the precision of the list. Radiants drift by
+about a degree per day during the activity window; the peak radiant is used
+throughout.
+"""
+from datetime import date, datetime
+
+import numpy as np
+from skyfield.api import wgs84
+
+from . import sky
+
+
+# (code, name, activity start (m, d), peak (m, d), activity end (m, d),
+#  ZHR (None = variable), radiant RA deg, radiant Dec deg, speed km/s)
+SHOWER_CATALOG = [
+    ('QUA', 'Quadrantids', (12, 28), (1, 3), (1, 12), 80, 230.0, 49.0, 41),
+    ('GUM', 'gamma Ursae Minorids', (1, 10), (1, 18), (1, 22), 3, 228.0, 67.0, 31),
+    ('ACE', 'alpha Centaurids', (1, 31), (2, 8), (2, 20), 6, 210.0, -59.0, 58),
+    ('GNO', 'gamma Normids', (2, 25), (3, 14), (3, 28), 6, 239.0, -50.0, 56),
+    ('LYR', 'Lyrids', (4, 14), (4, 22), (4, 30), 18, 271.0, 34.0, 49),
+    ('PPU', 'pi Puppids', (4, 15), (4, 23), (4, 28), None, 110.0, -45.0, 18),
+    ('ETA', 'Eta Aquariids', (4, 19), (5, 6), (5, 28), 50, 338.0, -1.0, 66),
+    ('ELY', 'eta Lyrids', (5, 3), (5, 9), (5, 14), 3, 287.0, 44.0, 43),
+    ('JBO', 'June Bootids', (6, 22), (6, 27), (7, 2), None, 224.0, 48.0, 18),
+    ('JPE', 'July Pegasids', (7, 4), (7, 10), (7, 14), 3, 347.0, 11.0, 64),
+    ('CAP', 'alpha Capricornids', (7, 3), (7, 30), (8, 15), 5, 307.0, -10.0, 23),
+    ('SDA', 'Southern delta Aquariids', (7, 12), (7, 30), (8, 23), 25, 340.0, -16.0, 41),
+    ('PER', 'Perseids', (7, 17), (8, 12), (8, 24), 100, 48.0, 58.0, 59),
+    ('KCG', 'kappa Cygnids', (8, 3), (8, 17), (8, 25), 3, 286.0, 59.0, 25),
+    ('AUR', 'Aurigids', (8, 28), (9, 1), (9, 5), 6, 91.0, 39.0, 66),
+    ('SPE', 'September epsilon Perseids', (9, 5), (9, 9), (9, 21), 5, 48.0, 40.0, 64),
+    ('DRA', 'Draconids', (10, 6), (10, 8), (10, 10), None, 262.0, 54.0, 21),
+    ('STA', 'Southern Taurids', (9, 10), (10, 10), (11, 20), 5, 32.0, 9.0, 27),
+    ('DAU', 'delta Aurigids', (10, 10), (10, 11), (10, 18), 2, 84.0, 44.0, 64),
+    ('EGE', 'epsilon Geminids', (10, 14), (10, 18), (10, 27), 3, 102.0, 27.0, 70),
+    ('ORI', 'Orionids', (10, 2), (10, 21), (11, 7), 20, 95.0, 16.0, 66),
+    ('LMI', 'Leonis Minorids', (10, 19), (10, 24), (10, 27), 2, 162.0, 37.0, 62),
+    ('NTA', 'Northern Taurids', (10, 20), (11, 12), (12, 10), 5, 58.0, 22.0, 29),
+    ('LEO', 'Leonids', (11, 6), (11, 17), (11, 30), 15, 152.0, 22.0, 71),
+    ('AMO', 'alpha Monocerotids', (11, 15), (11, 21), (11, 25), None, 117.0, 1.0, 65),
+    ('NOO', 'November Orionids', (11, 13), (11, 28), (12, 6), 3, 91.0, 16.0, 44),
+    ('PHO', 'Phoenicids', (11, 28), (12, 2), (12, 9), None, 18.0, -53.0, 18),
+    ('PUP', 'Puppid-Velids', (12, 1), (12, 7), (12, 15), 10, 123.0, -45.0, 40),
+    ('MON', 'Monocerotids', (12, 5), (12, 9), (12, 20), 3, 100.0, 8.0, 41),
+    ('HYD', 'sigma Hydrids', (12, 3), (12, 9), (12, 20), 7, 125.0, 2.0, 58),
+    ('GEM', 'Geminids', (12, 4), (12, 14), (12, 20), 150, 112.0, 33.0, 35),
+    ('COM', 'Comae Berenicids', (12, 12), (12, 16), (12, 23), 3, 175.0, 18.0, 65),
+    ('DLM', 'December Leonis Minorids', (12, 5), (12, 20), (2, 4), 5, 161.0, 30.0, 64),
+    ('URS', 'Ursids', (12, 17), (12, 22), (12, 26), 10, 217.0, 76.0, 33),
+]
+
+# Showers at least this strong are "major" (the page's upcoming-events box).
+MAJOR_ZHR = 10
+
+# The Sun below this altitude counts as night for meteor watching.
+NIGHT_SUN_ALTITUDE = -12.0
+NIGHT_STEP_MINUTES = 10
+
+_RADIANT_RA = np.array([s[6] for s in SHOWER_CATALOG])
+_RADIANT_DEC = np.array([s[7] for s in SHOWER_CATALOG])
+_INDEX_BY_CODE = {s[0]: i for i, s in enumerate(SHOWER_CATALOG)}
+# Variable showers (ZHR None) count as 0: they are rarely worth a headline.
+_ZHR = np.array([s[5] or 0 for s in SHOWER_CATALOG])
+
+
+def _day_of_year(month: int, day: int) -> int:
+    # Non-leap reference year; 29 February folds onto 28 February.
+    return date(2001, month, min(day, 28) if month == 2 else day).timetuple().tm_yday
+
+
+# Next-peak index: catalog positions ordered by peak day of year.
+_PEAK_DOY = np.array([_day_of_year(*s[3]) for s in SHOWER_CATALOG])
+_PEAK_ORDER = np.argsort(_PEAK_DOY, kind='stable')
+_PEAK_DOY_SORTED = _PEAK_DOY[_PEAK_ORDER]
+
+
+def _occurrence(index: int, on: date, next_peak: bool = False):
+    """(start, peak, end) dates of the occurrence that has not ended by ``on``.
+
+    With ``next_peak`` it is the occurrence whose peak is on or after ``on``
+    instead (differs for a shower that is active but past its peak).
+    """
+    _, _, start, peak, end = SHOWER_CATALOG[index][:5]
+    for year in (on.year - 1, on.year, on.year + 1):
+        peak_d = date(year, *peak)
+        start_d = date(year - 1 if start > peak else year, *start)
+        end_d = date(year + 1 if end < peak else year, *end)
+        if (peak_d if next_peak else end_d) >= on:
+            return start_d, peak_d, end_d
+    raise AssertionError('unreachable: every shower recurs yearly')
+
+
+def _shower_entry(index: int, on: date, next_peak: bool = False):
+    code, name, _, _, _, zhr, ra, dec, speed = SHOWER_CATALOG[index]
+    start_d, peak_d, end_d = _occurrence(index, on, next_peak)
+    return {
+        'code': code,
+        'name': name,
+        'peak': peak_d.isoformat(),
+        'activity_start': start_d.isoformat(),
+        'activity_end': end_d.isoformat(),
+        'active': start_d <= on <= end_d,
+        'days_to_peak': (peak_d - on).days,
+        'zhr': zhr,
+        'radiant': {'ra_deg': ra, 'dec_deg': dec},
+        'speed_km_s': speed,
+    }
+
+
+def next_peak_indices(on: date, count: int, min_zhr: int | None = None):
+    """Catalog indices of the next ``count`` peaks on or after ``on``.
+
+    ``min_zhr`` restricts the index to showers at least that strong.
+    """
+    if min_zhr is None:
+        order, peak_doy = _PEAK_ORDER, _PEAK_DOY_SORTED
+    else:
+        keep = _ZHR[_PEAK_ORDER] >= min_zhr
+        order, peak_doy = _PEAK_ORDER[keep], _PEAK_DOY_SORTED[keep]
+    count = min(count, len(order))
+    first = np.searchsorted(peak_doy, _day_of_year(on.month, on.day), side='left')
+    return [int(i) for i in order[(first + np.arange(count)) % len(order)]]
+
+
+def upcoming(on: date, count: int = 5):
+    """The next ``count`` showers by peak date."""
+    return [_shower_entry(i, on, next_peak=True) for i in next_peak_indices(on, count)]
+
+
+def active(on: date):
+    """Showers whose activity window contains ``on``, by peak date."""
+    entries = [_shower_entry(i, on) for i in range(len(SHOWER_CATALOG))]
+    return sorted((e for e in entries if e['active']), key=lambda e: e['peak'])
+
+
+def next_peak(when: datetime):
+    """Summary of the next major peak, as shown in the page's upcoming events."""
+    (index,) = next_peak_indices(when.date(), 1, min_zhr=MAJOR_ZHR)
+    entry = _shower_entry(index, when.date(), next_peak=True)
+    return {'name': entry['name'], 'date': entry['peak']}
+
+
+def radiant_visibility(ts, bodies, entries, lat: float, lon: float):
+    """Radiant altitude over the peak night of each entry, for one observer.
+
+    Every night is sampled on the same grid (local solar noon to noon,
+    NIGHT_STEP_MINUTES apart), so the Sun's altitude for all nights is one
+    Skyfield call and the radiant altitudes are one broadcast expression.
+    Adds a ``visibility`` dict to each entry in place.
+    """
+    if not entries:
+        return entries
+    peaks = [date.fromisoformat(e['peak']) for e in entries]
+    steps = 24 * 60 // NIGHT_STEP_MINUTES + 1
+    hours = 12.0 - lon / 15.0 + np.arange(steps) * (NIGHT_STEP_MINUTES / 60.0)
+    years = np.repeat([d.year for d in peaks], steps)
+    months = np.repeat([d.month for d in peaks], steps)
+    days = np.repeat([d.day for d in peaks], steps)
+    t = ts.utc(years, months, days, np.tile(hours, len(peaks)))
+
+    observer = bodies['earth'] + wgs84.latlon(lat, lon)
+    sun_alt = observer.at(t).observe(bodies['sun']).apparent().altaz()[0].degrees
+    night = (sun_alt < NIGHT_SUN_ALTITUDE).reshape(len(peaks), steps)
+
+    index = [_INDEX_BY_CODE[e['code']] for e in entries]
+    gast = t.gast.reshape(len(peaks), steps)
+    alt, _ = sky.altaz(_RADIANT_RA[index][:, None], _RADIANT_DEC[index][:, None], lat, lon, gast)
+
+    stamps = np.asarray(t.utc_strftime('%Y-%m-%dT%H:%MZ')).reshape(len(peaks), steps)
+    for row, entry in enumerate(entries):
+        mask = night[row]
+        if not mask.any():
+            entry['visibility'] = {'night_start': None, 'night_end': None, 'times': [],
+                                   'radiant_altitude_deg': [], 'max_radiant_altitude_deg': None,
+                                   'best_time': None}
+            continue
+        night_alt = alt[row][mask]
+        night_times = stamps[row][mask]
+        best = int(night_alt.argmax())
+        entry['visibility'] = {
+            'night_start': str(night_times[0]),
+            'night_end': str(night_times[-1]),
+            'times': night_times.tolist(),
+            'radiant_altitude_deg': np.round(night_alt, 1).tolist(),
+            'max_radiant_altitude_deg': round(float(night_alt[best]), 1),
+            'best_time': str(night_times[best]),
+        }
+    return entries
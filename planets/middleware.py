@@ -0,0 +1,114 @@
+import cProfile
+import random
+import re
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from . import encoding, profiling
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    encoding.JSON_CONTENT_TYPE,
+    encoding.PACKED_CONTENT_TYPE,
+    encoding.MSGPACK_CONTENT_TYPE,
+)
+
+_ACCEPTS_BR = re.compile(r'\bbr\b')
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class ApiCompressionMiddleware:
+    """Compress large API responses with brotli (if installed) or gzip.
+
+    Unlike django.middleware.gzip.GZipMiddleware this only touches the API
+    content types, so HTML pages carrying CSRF tokens are left alone (BREACH).
+    Responses smaller than PLANETS_COMPRESS_MIN_BYTES are not worth the CPU.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_bytes = getattr(settings, 'PLANETS_COMPRESS_MIN_BYTES', 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_CONTENT_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_bytes:
+            return response
+
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if BROTLI_AVAILABLE and _ACCEPTS_BR.search(accept):
+            compressed, coding = brotli.compress(response.content, quality=5), 'br'
+        elif _ACCEPTS_GZIP.search(accept):
+            compressed, coding = compress_string(response.content), 'gzip'
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        # The representation changed, so a strong ETag no longer applies.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class RequestProfilerMiddleware:
+    """Profile sampled (or explicitly requested) requests with cProfile.
+
+    Off unless PLANETS_PROFILER_ENABLED is set (then a PLANETS_PROFILER_SAMPLE_RATE
+    share of requests is profiled) or the request carries a signed
+    X-Planets-Profile token. See planets.profiling.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PLANETS_PROFILER_ENABLED', False)
+        self.sample_rate = getattr(settings, 'PLANETS_PROFILER_SAMPLE_RATE', 0.01)
+
+    def _should_profile(self, request):
+        if request.path.startswith('/api/profiles/'):
+            return False
+        if request.META.get(profiling.TOKEN_HEADER):
+            return profiling.token_is_valid(request.META[profiling.TOKEN_HEADER])
+        return self.enabled and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active (e.g. a concurrent profiled request).
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - start
+        try:
+            response['X-Planets-Profile-Id'] = profiling.save_profile(profiler, request, response, duration)
+        except OSError:
+            pass
+        return response
@@ -0,0 +1,125 @@
+"""True heliocentric orbit polylines sampled from the ephemeris.
+
+Each orbit is sampled once over one orbital period and then simplified with
+Ramer-Douglas-Peucker at a few levels of detail, so clients can pick the
+payload size that suits their zoom level.
+"""
+import numpy as np
+from skyfield.framelib import ecliptic_frame
+
+
+SAMPLES_PER_ORBIT = 1440
+
+# Level of detail -> simplification tolerance as a fraction of the mean orbit radius.
+LOD_TOLERANCES = {
+    0: 0.0,
+    1: 1e-4,
+    2: 1e-3,
+    3: 1e-2,
+}
+
+J2000_TT = 2451545.0
+
+
+def ephemeris_coverage(bodies):
+    """(first_jd, last_jd) covered by every segment of the kernel, or None."""
+    starts, ends = [], []
+    for segment in getattr(bodies, 'segments', []):
+        spk = getattr(segment, 'spk_segment', None)
+        if spk is not None:
+            starts.append(spk.start_jd)
+            ends.append(spk.end_jd)
+    if not starts:
+        return None
+    return max(starts), min(ends)
+
+
+def orbit_window(period_days: float, coverage):
+    """One period centred on J2000, shifted or clipped to fit the ephemeris.
+
+    Returns (start_jd, end_jd, fraction_of_period_covered).
+    """
+    start, end = J2000_TT - period_days / 2, J2000_TT + period_days / 2
+    if coverage is None:
+        return start, end, 1.0
+    first, last = coverage
+    # Keep a small margin: light-time and segment edges.
+    first, last = first + 1.0, last - 1.0
+    if end - start > last - first:
+        return first, last, (last - first) / period_days
+    if start < first:
+        start, end = first, first + period_days
+    elif end > last:
+        start, end = last - period_days, last
+    return start, end, 1.0
+
+
+def sample_orbit(ts, sun, body, start_jd: float, end_jd: float, samples: int = SAMPLES_PER_ORBIT):
+    """Heliocentric ecliptic (J2000) positions in AU, shape (samples, 3)."""
+    t = ts.tt_jd(np.linspace(start_jd, end_jd, samples))
+    xyz = (body - sun).at(t).frame_xyz(ecliptic_frame).au
+    return np.asarray(xyz).T
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Ramer-Douglas-Peucker simplification (iterative, vectorized per segment)."""
+    n = len(points)
+    if tolerance <= 0 or n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = points[first], points[last]
+        segment = points[first + 1:last]
+        ab = b - a
+        length = np.linalg.norm(ab)
+        if length == 0:
+            dist = np.linalg.norm(segment - a, axis=1)
+        else:
+            dist = np.linalg.norm(np.cross(segment - a, ab), axis=1) / length
+        i = int(dist.argmax())
+        if dist[i] > tolerance:
+            split = first + 1 + i
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
+
+def sample_paths(ts, bodies, planets):
+    """Full-resolution orbit of every planet, the input for ``build_paths``.
+
+    ``planets`` is a list of (planet_id, skyfield key, period_days).
+    """
+    sun = bodies['sun']
+    coverage = ephemeris_coverage(bodies)
+    samples = {}
+    for planet_id, sf_key, period_days in planets:
+        start_jd, end_jd, covered = orbit_window(period_days, coverage)
+        samples[planet_id] = {
+            'period_days': period_days,
+            'start': ts.tt_jd(start_jd).utc_strftime('%Y-%m-%d'),
+            'end': ts.tt_jd(end_jd).utc_strftime('%Y-%m-%d'),
+            'complete': covered >= 1.0,
+            'period_fraction': round(min(covered, 1.0), 4),
+            'points': sample_orbit(ts, sun, bodies[sf_key], start_jd, end_jd),
+        }
+    return samples
+
+
+def build_paths(samples, lod: int):
+    """Paths for one level of detail, simplified from ``sample_paths`` output."""
+    fraction = LOD_TOLERANCES[lod]
+    paths = {}
+    for planet_id, sampled in samples.items():
+        points = np.asarray(sampled['points'], dtype=float)
+        mean_radius = float(np.linalg.norm(points, axis=1).mean())
+        paths[planet_id] = {
+            **{k: v for k, v in sampled.items() if k != 'points'},
+            'points': np.round(simplify(points, fraction * mean_radius), 6),
+        }
+    return paths
@@ -1,9 +1,12 @@
 from skyfield.api import load, Topos    #topos crea un punto en la tierra con lat y lon
 import datetime                         #load carga las efemérides
+import numpy as np
+
+from .ephemeris import DISTANCE_KERNEL
 
 
 ts = load.timescale()           #convertimos la fecha y hora a un formato que skyfield entienda
-bodies = load("de440.bsp")      #cargamos las efemérides
+bodies = load(DISTANCE_KERNEL)  #cargamos las efemérides (de440.bsp)
 
 #latitud y longitud de vigo
 lat = 42.2406
@@ -29,17 +32,78 @@ aliases = {
 }
 
 
-#funcion que recibe el nombre que skyfield necesita para devolver la distancia                                                        
-def distance_body(name):        
+#velocidad de la luz en km/s, para pasar de distancia a tiempo-luz
+C_KM_S = 299792.458
+
+
+#nucleo vectorizado: distancia en km desde nuestra posición para uno o muchos instantes
+#si t es un array de tiempos, skyfield lo calcula todo de una vez y devuelve un array
+def distance_km(name, t):
 
     if name == "earth":  #comprobamos si es la tierra lo que piden
-        return 0
-    
+        return np.zeros(t.shape) if t.shape else 0
+
     body = bodies[name]
-    astrom = location.at(ts.now()).observe(body)
+    astrom = location.at(t).observe(body)
     return astrom.distance().km
 
 
+#funcion que recibe el nombre que skyfield necesita para devolver la distancia                                                        
+def distance_body(name):        
+    return distance_km(name, ts.now())
+
+
+#busca los minimos locales de una serie de distancias (acercamientos maximos)
+#y afina cada uno con una parabola por los tres puntos que lo rodean
+def closest_approaches(km, step_days):
+    km = np.asarray(km, dtype=float)
+    if km.size < 3:
+        return []
+    inner = np.flatnonzero((km[1:-1] < km[:-2]) & (km[1:-1] <= km[2:])) + 1
+    found = []
+    for i in inner:
+        left, mid, right = km[i - 1], km[i], km[i + 1]
+        curvature = left - 2 * mid + right
+        offset = 0.5 * (left - right) / curvature if curvature > 0 else 0.0
+        found.append((i + offset, mid - 0.25 * (left - right) * offset))
+    return [(index * step_days, dist) for index, dist in found]
+
+
+#array de tiempos de skyfield entre start y end (datetimes con zona horaria) cada step
+def time_range(start, end, step):
+    step_s = step.total_seconds()
+    count = int((end - start).total_seconds() // step_s) + 1
+    offsets = np.arange(count) * step_s
+    return ts.utc(start.year, start.month, start.day, start.hour, start.minute, start.second + offsets)
+
+
+#serie de distancias entre start y end cada step
+def distance_series(planet_input, start, end, step):
+    planet_name = aliases[planet_input.lower().strip()]
+    t = time_range(start, end, step)
+    km = np.asarray(distance_km(planet_name, t), dtype=float)
+    approaches = [
+        (t[0] + days, dist) for days, dist in closest_approaches(km, step.total_seconds() / 86400.0)
+    ]
+    return t, km, km / C_KM_S, approaches
+
+
+#posiciones baricentricas (km) de todos los cuerpos de aliases en una sola pasada:
+#array (3, N) para un instante o (3, N, T) para T instantes
+def position_table(t):
+    names = list(aliases)
+    positions = np.stack([bodies[aliases[name]].at(t).position.km for name in names], axis=1)
+    return names, positions
+
+
+#matriz NxN de distancias geometricas entre todos los cuerpos (la tierra es el geocentro)
+#se resta cada par de posiciones con broadcasting en vez de hacer N² observe()
+def distance_matrix(t):
+    names, positions = position_table(t)
+    diff = positions[:, :, np.newaxis] - positions[:, np.newaxis, :]
+    return names, np.sqrt((diff ** 2).sum(axis=0))
+
+
 #funcion que recibe el nombre que el usuario introduce y lo traduce para skyfield
 def get_distance(planet_input):
     planet_name = aliases[planet_input.lower().strip()]
@@ -0,0 +1,110 @@
+"""Opt-in request profiling.
+
+A request is profiled with cProfile when PLANETS_PROFILER_ENABLED is on and it
+falls inside PLANETS_PROFILER_SAMPLE_RATE, or when it carries a valid signed
+``X-Planets-Profile`` token (see ``manage.py profiler_token``). The pstats
+dumps of the last PLANETS_PROFILER_KEEP profiled requests are kept in
+PLANETS_PROFILER_DIR and listed by the token-protected ``/api/profiles/`` view.
+
+Tokens are signed with PLANETS_PROFILER_SECRET, never with SECRET_KEY (which
+falls back to a public development value). Without that secret no token is
+valid, so header-triggered profiling and the listing views are off.
+"""
+import io
+import json
+import pstats
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+
+
+TOKEN_HEADER = 'HTTP_X_PLANETS_PROFILE'
+TOKEN_SALT = 'planets.profiling'
+
+
+def signing_secret() -> str | None:
+    secret = getattr(settings, 'PLANETS_PROFILER_SECRET', None)
+    if not secret or secret.startswith('django-insecure-'):
+        return None
+    return secret
+
+
+def make_token() -> str:
+    secret = signing_secret()
+    if secret is None:
+        raise ImproperlyConfigured('Set PLANETS_PROFILER_SECRET to issue profiler tokens.')
+    return signing.dumps('profile', key=secret, salt=TOKEN_SALT)
+
+
+def token_is_valid(token: str | None) -> bool:
+    secret = signing_secret()
+    if not token or secret is None:
+        return False
+    max_age = getattr(settings, 'PLANETS_PROFILER_TOKEN_MAX_AGE', 7 * 24 * 3600)
+    try:
+        return signing.loads(token, key=secret, salt=TOKEN_SALT, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def request_token(request) -> str | None:
+    # Header only: a query-string token would end up in access and CDN logs.
+    return request.META.get(TOKEN_HEADER)
+
+
+def profiles_dir() -> Path:
+    default = Path(tempfile.gettempdir()) / 'planets-profiles'
+    return Path(getattr(settings, 'PLANETS_PROFILER_DIR', None) or default)
+
+
+def save_profile(profiler, request, response, duration_s: float) -> str:
+    """Store a finished profile and prune to the newest PLANETS_PROFILER_KEEP."""
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f'{time.strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex[:8]}'
+    profiler.dump_stats(str(directory / f'{profile_id}.prof'))
+    meta = {
+        'id': profile_id,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': getattr(response, 'status_code', None),
+        'duration_ms': round(duration_s * 1000.0, 2),
+        'created_at_utc': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()),
+    }
+    (directory / f'{profile_id}.json').write_text(json.dumps(meta), encoding='utf-8')
+
+    keep = getattr(settings, 'PLANETS_PROFILER_KEEP', 20)
+    for old in sorted(directory.glob('*.json'))[:-keep or None]:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.prof').unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles():
+    entries = []
+    for path in sorted(profiles_dir().glob('*.json'), reverse=True):
+        try:
+            entries.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return entries
+
+
+def profile_path(profile_id: str) -> Path | None:
+    # Ids are generated by save_profile; refuse anything that could escape the directory.
+    if not profile_id or '/' in profile_id or '\\' in profile_id or profile_id.startswith('.'):
+        return None
+    path = profiles_dir() / f'{profile_id}.prof'
+    return path if path.is_file() else None
+
+
+def render_stats(path: Path, sort: str = 'cumulative', limit: int = 60) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,227 @@
+"""Single-flight coalescing for expensive computations.
+
+Concurrent callers asking for the same key wait for one in-flight computation
+and share its result instead of repeating it (moon-phase searches, SBDB and
+Horizons lookups on a cold page load).
+
+Within a process this uses a lock and an Event per key. Across processes the
+first caller takes a short lock and the others poll until the result shows up.
+The lock is ``cache.add`` on Redis and locmem (atomic there); the file-based
+cache's ``add`` is a check-then-set, so with that backend the lock is a file
+created with O_CREAT | O_EXCL next to the cache entries.
+
+``do`` publishes the result in the cache for the other processes; ``do_polling``
+leaves storing it to the caller and has waiters poll the caller's own lookup
+(planets.caching stores results compactly under its own keys).
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+_MISSING = object()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _FileLock:
+    """Cross-process lock files for the file-based cache backend."""
+
+    def __init__(self, directory: Path, timeout: float):
+        self.directory = directory
+        self.timeout = timeout
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{hashlib.sha1(key.encode("utf-8")).hexdigest()}.lock'
+
+    def acquire(self, key: str, token: str) -> bool:
+        path = self._path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                try:
+                    stale = time.time() - path.stat().st_mtime > self.timeout
+                except FileNotFoundError:
+                    continue
+                if not stale:
+                    return False
+                # The holder died without releasing: break the lock and retry once.
+                path.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(token)
+            return True
+        return False
+
+    def owner(self, key: str):
+        try:
+            return self._path(key).read_text()
+        except FileNotFoundError:
+            return _MISSING
+
+    def release(self, key: str, token: str):
+        if self.owner(key) == token:
+            self._path(key).unlink(missing_ok=True)
+
+
+class SingleFlight:
+    def __init__(self, prefix='singleflight', lock_timeout=None, result_ttl=None, poll_interval=0.05,
+                 alias='default'):
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout or getattr(settings, 'PLANETS_SINGLEFLIGHT_LOCK_TIMEOUT', 60)
+        self.result_ttl = result_ttl or getattr(settings, 'PLANETS_SINGLEFLIGHT_RESULT_TTL', 30)
+        self.poll_interval = poll_interval
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """Return ``fn(*args, **kwargs)``, sharing one evaluation per ``key``."""
+        return self._do(key, lambda: fn(*args, **kwargs), None)
+
+    def do_polling(self, key: str, fn, poll):
+        """Like ``do`` for a caller that stores ``fn()``'s result itself.
+
+        Nothing is published under the single-flight keys; callers waiting in
+        other processes call ``poll()``, which returns ``(found, value)``.
+        """
+        return self._do(key, fn, poll)
+
+    def _do(self, key, compute, poll):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, compute, poll)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _do_shared(self, key, compute, poll):
+        lock_key = f'{self.prefix}:lock:{key}'
+        result_key = f'{self.prefix}:result:{key}'
+        publish = poll is None
+        if publish:
+            def poll():
+                cached = self._cache_get(result_key)
+                return cached is not _MISSING, cached
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        acquired = self._lock_acquire(lock_key, token)
+        while not acquired:
+            # Another process is computing; wait for its result.
+            found, value = poll()
+            if found:
+                return value
+            if self._lock_owner(lock_key) is _MISSING or time.monotonic() > deadline:
+                # The other process gave up (or its lock expired): compute ourselves.
+                return compute()
+            time.sleep(self.poll_interval)
+            acquired = self._lock_acquire(lock_key, token)
+
+        try:
+            # A previous leader may have finished between our polls.
+            found, value = poll()
+            if found:
+                return value
+            result = compute()
+            if publish:
+                self._cache_set(result_key, result)
+            return result
+        finally:
+            self._lock_release(lock_key, token)
+
+    # Cache failures must never break the computation itself.
+
+    def _backend(self):
+        return caches[self.alias]
+
+    def _file_lock(self):
+        backend = self._backend()
+        if isinstance(backend, FileBasedCache):
+            return _FileLock(Path(backend._dir) / 'singleflight-locks', self.lock_timeout)
+        return None
+
+    def _lock_acquire(self, key, token):
+        try:
+            file_lock = self._file_lock()
+            if file_lock is not None:
+                return file_lock.acquire(key, token)
+            return self._backend().add(key, token, self.lock_timeout)
+        except Exception:
+            return True
+
+    def _lock_owner(self, key):
+        try:
+            file_lock = self._file_lock()
+            if file_lock is not None:
+                return file_lock.owner(key)
+            return self._backend().get(key, _MISSING)
+        except Exception:
+            return _MISSING
+
+    def _lock_release(self, key, token):
+        try:
+            file_lock = self._file_lock()
+            if file_lock is not None:
+                file_lock.release(key, token)
+            elif self._backend().get(key, _MISSING) == token:
+                self._backend().delete(key)
+        except Exception:
+            pass
+
+    def _cache_get(self, key):
+        try:
+            return self._backend().get(key, _MISSING)
+        except Exception:
+            return _MISSING
+
+    def _cache_set(self, key, value):
+        try:
+            self._backend().set(key, value, self.result_ttl)
+        except Exception:
+            pass
+
+
+_default = SingleFlight()
+
+
+def single_flight(key: str, fn, *args, **kwargs):
+    """Run ``fn`` through the process-wide SingleFlight group."""
+    return _default.do(key, fn, *args, **kwargs)
+
+
+def single_flight_polling(key: str, fn, poll):
+    """Run ``fn()`` through the process-wide group without publishing its result."""
+    return _default.do_polling(key, fn, poll)
@@ -0,0 +1,27 @@
+"""Horizontal coordinates with plain NumPy broadcasting.
+
+Skyfield's ``altaz()`` handles one observer per call; these helpers take
+RA/Dec of date and any mix of observer and time arrays, so a whole grid of
+bodies x observers x instants is a single vectorized expression.
+Refraction is not applied.
+"""
+import numpy as np
+
+
+def altaz(ra_deg, dec_deg, lat_deg, lon_deg, gast_hours):
+    """Altitude and azimuth in degrees (azimuth from north through east).
+
+    ``ra_deg``/``dec_deg`` are equatorial coordinates of date, ``gast_hours``
+    is Greenwich apparent sidereal time (``Time.gast``) and longitudes are
+    east-positive. All arguments broadcast against each other.
+    """
+    hour_angle = np.radians(np.asarray(gast_hours) * 15.0 + lon_deg - ra_deg)
+    dec = np.radians(dec_deg)
+    lat = np.radians(lat_deg)
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    alt = np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+    az = np.degrees(np.arctan2(
+        -np.cos(dec) * np.sin(hour_angle),
+        np.sin(dec) * np.cos(lat) - np.cos(dec) * np.sin(lat) * np.cos(hour_angle),
+    )) % 360.0
+    return alt, az
@@ -25,6 +25,35 @@ function safeParseJson(text) {
     }
 }
 
+// Payloads pre-rendered by `manage.py export_ephemeris` are served as static files.
+// index.json names the current export version and date range; dates outside it
+// (or any failure) fall back to the live API.
+let ephemerisIndexPromise = null;
+
+function loadEphemerisIndex() {
+    if (!ephemerisIndexPromise) {
+        ephemerisIndexPromise = fetch('/static/ephemeris/index.json')
+            .then((res) => (res.ok ? res.json() : null))
+            .catch(() => null);
+    }
+    return ephemerisIndexPromise;
+}
+
+async function fetchEphemerisJson(relPath, dateStr, apiUrl) {
+    const index = await loadEphemerisIndex();
+    if (index && index.version && dateStr && dateStr >= index.start && dateStr <= index.end) {
+        try {
+            const res = await fetch(`/static/ephemeris/${index.version}/${relPath}`);
+            if (res.ok) return await res.json();
+        } catch {
+            // ignore, use the API
+        }
+    }
+    const res = await fetch(apiUrl, { headers: { 'Accept': 'application/json' } });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    return res.json();
+}
+
 // si el  id es por ejemplo mars, devuelve Mars y si es null devuelve Planet
 // "sun" → "Sun", "" → "Planet"
 // id.slice(1) devuelve el String desde el segundo caracter (el 0 cuenta jeje)
@@ -223,9 +252,7 @@ window.addEventListener('DOMContentLoaded', () => {
         const selected = dateInput && dateInput.value ? dateInput.value : '';
         const url = `/api/planet-info/?planet=${encodeURIComponent(planetId)}&date=${encodeURIComponent(selected)}`;
         try {
-            const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
-            if (!res.ok) throw new Error(`HTTP ${res.status}`);
-            const data = await res.json();
+            const data = await fetchEphemerisJson(`planet-info/${planetId}/${selected}.json`, selected, url);
             if (data && data.error) throw new Error(data.error);
             const notes = info.notes || '';
 
@@ -348,9 +375,7 @@ window.addEventListener('DOMContentLoaded', () => {
 
         try {
             const url = `/api/orbit-positions/?date=${encodeURIComponent(dateStr)}`;
-            const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
-            if (!res.ok) throw new Error(`HTTP ${res.status}`);
-            const data = await res.json();
+            const data = await fetchEphemerisJson(`orbit-positions/${dateStr}.json`, dateStr, url);
             if (data && data.error) throw new Error(data.error);
             if (token !== lastRequestToken) return; // respuesta vieja
 
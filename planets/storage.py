@@ -0,0 +1,82 @@
+import fnmatch
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    from PIL import Image, ImageSequence
+    PIL_AVAILABLE = True
+except Exception:
+    Image = ImageSequence = None
+    PIL_AVAILABLE = False
+
+
+DEFAULT_WEBP_SOURCES = ('planets/gifs/*.gif', 'planets/gifs/*.png')
+
+
+def webp_variant_name(name: str) -> str:
+    """'planets/gifs/mars.gif' -> 'planets/gifs/mars.webp'."""
+    stem, _, _ext = name.rpartition('.')
+    return f'{stem}.webp' if stem else ''
+
+
+def convert_to_webp(data: bytes) -> bytes:
+    """Re-encode a GIF/PNG (animated or not) as lossless WebP.
+
+    The sprites are pixel art, so lossless keeps them crisp; frame durations
+    and looping are carried over from the source.
+    """
+    with Image.open(BytesIO(data)) as im:
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(im):
+            frames.append(frame.convert('RGBA'))
+            durations.append(frame.info.get('duration', im.info.get('duration', 100)))
+        out = BytesIO()
+        save_kwargs = {'format': 'WEBP', 'lossless': True, 'method': 6}
+        if len(frames) > 1:
+            save_kwargs.update(
+                save_all=True,
+                append_images=frames[1:],
+                duration=durations,
+                loop=im.info.get('loop', 0),
+            )
+        frames[0].save(out, **save_kwargs)
+        return out.getvalue()
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Manifest (content-hashed) storage that also emits WebP copies of sprites.
+
+    During collectstatic every file matching PLANETS_WEBP_SOURCES gets a
+    ``.webp`` sibling, which is then hashed like any other file. Templates pick
+    it up through ``{% optimized_static %}`` and keep the original as fallback
+    (e.g. when Pillow is not installed at build time). Hashed names let
+    whitenoise serve everything with far-future, immutable cache headers.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run and PIL_AVAILABLE:
+            self._add_webp_variants(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _add_webp_variants(self, paths):
+        patterns = getattr(settings, 'PLANETS_WEBP_SOURCES', DEFAULT_WEBP_SOURCES)
+        for name in list(paths):
+            if not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            storage, path = paths[name]
+            with storage.open(path) as f:
+                source = f.read()
+            try:
+                webp = convert_to_webp(source)
+            except Exception:
+                continue
+            if len(webp) >= len(source):
+                continue
+            target = webp_variant_name(name)
+            if self.exists(target):
+                self.delete(target)
+            self.save(target, ContentFile(webp))
+            paths[target] = (self, target)
@@ -0,0 +1,20 @@
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+from planets.storage import webp_variant_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def optimized_static(path):
+    """URL of the WebP variant of ``path`` when collectstatic produced one.
+
+    Falls back to the original file (development, or no Pillow at build time).
+    """
+    variant = webp_variant_name(path)
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None) or {}
+    if variant and variant in hashed_files:
+        return staticfiles_storage.url(variant)
+    return static(path)
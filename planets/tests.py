@@ -1,3 +1,631 @@
-from django.test import TestCase
+import cProfile
+import gzip
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core import signing
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from skyfield.api import Star, wgs84
+from skyfield.units import Angle
+
+from planets import bright_stars, encoding, meteor_showers, orbit_paths, profiling, upstream, views
+from planets import caching
+from planets.caching import TieredCache, tiered_cache
+from planets.middleware import ApiCompressionMiddleware
+from planets.singleflight import SingleFlight
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class PackedPositionsTests(SimpleTestCase):
+    def test_round_trip(self):
+        names = ['mercury', 'venus', 'earth']
+        radii = [90.0, 130.0, 170.0]
+        angles = np.array([[0.1, -1.2, 3.0], [0.2, -1.1, -3.1]])
+        data = encoding.pack_positions(names, radii, angles, date(2026, 1, 30), step_days=3)
+
+        unpacked = encoding.unpack_positions(data)
+        self.assertEqual(unpacked['names'], names)
+        self.assertEqual(unpacked['radii'], radii)
+        self.assertEqual(unpacked['dates'], ['2026-01-30', '2026-02-02'])
+        np.testing.assert_allclose(unpacked['angles'], angles, rtol=1e-6)
+
+    def test_single_frame(self):
+        data = encoding.pack_positions(['mars'], [210.0], [0.5], date(1999, 12, 31))
+        unpacked = encoding.unpack_positions(data)
+        self.assertEqual(unpacked['dates'], ['1999-12-31'])
+        self.assertEqual(len(unpacked['angles']), 1)
+
+    def test_mismatched_bodies(self):
+        with self.assertRaises(ValueError):
+            encoding.pack_positions(['mercury', 'venus'], [90.0], [[0.1, 0.2]], date(2026, 1, 1))
+
+    def test_rejects_foreign_buffer(self):
+        with self.assertRaises(ValueError):
+            encoding.unpack_positions(b'XXXX' + bytes(64))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingleFlightTests(SimpleTestCase):
+    def _run_concurrently(self, group, fn, callers=8):
+        results, errors = [], []
+        start = threading.Barrier(callers)
+
+        def caller():
+            start.wait()
+            try:
+                results.append(group.do('key', fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        return results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'value': 42}
+
+        results, errors = self._run_concurrently(SingleFlight(prefix='test-share'), compute)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 42}] * 8)
+
+    def test_errors_reach_every_caller(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            raise RuntimeError('upstream down')
+
+        results, errors = self._run_concurrently(SingleFlight(prefix='test-error'), compute)
+        self.assertEqual(results, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 8)
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+
+    def test_failure_is_not_remembered(self):
+        group = SingleFlight(prefix='test-retry')
+
+        def fail():
+            raise RuntimeError('upstream down')
+
+        with self.assertRaises(RuntimeError):
+            group.do('key', fail)
+        self.assertEqual(group.do('key', lambda: 'recovered'), 'recovered')
+
+
+class ClosestApproachTests(SimpleTestCase):
+    def setUp(self):
+        # Imported here: the module loads its JPL kernel at import time.
+        from planets.planets_distance import closest_approaches
+        self.closest_approaches = closest_approaches
+
+    def test_parabola_vertex_between_samples(self):
+        index = np.arange(11)
+        km = 5.0 * (index - 3.37) ** 2 + 1000.0
+        (days, dist), = self.closest_approaches(km, step_days=0.5)
+        self.assertAlmostEqual(days, 3.37 * 0.5)
+        self.assertAlmostEqual(dist, 1000.0)
+
+    def test_every_local_minimum(self):
+        km = np.cos(np.linspace(0, 4 * np.pi, 401)) + 2.0
+        approaches = self.closest_approaches(km, step_days=1.0)
+        self.assertEqual(len(approaches), 2)
+        for days, dist in approaches:
+            self.assertAlmostEqual(dist, 1.0, places=6)
+
+    def test_no_minimum(self):
+        self.assertEqual(self.closest_approaches(np.arange(10.0), step_days=1.0), [])
+        self.assertEqual(self.closest_approaches([3.0, 1.0], step_days=1.0), [])
+
+
+def _max_deviation(points, simplified):
+    """Largest distance from ``points`` to the ``simplified`` polyline."""
+    a, b = simplified[:-1], simplified[1:]
+    ab = b - a
+    rel = points[:, None, :] - a[None, :, :]
+    u = np.clip(np.einsum('psk,sk->ps', rel, ab) / np.einsum('sk,sk->s', ab, ab), 0.0, 1.0)
+    nearest = a[None, :, :] + u[:, :, None] * ab[None, :, :]
+    return np.linalg.norm(points[:, None, :] - nearest, axis=2).min(axis=1).max()
+
+
+class SimplifyTests(SimpleTestCase):
+    def setUp(self):
+        angle = np.linspace(0, 2 * np.pi, 720)
+        self.circle = np.column_stack([np.cos(angle), np.sin(angle), np.zeros_like(angle)])
+
+    def test_zero_tolerance_keeps_everything(self):
+        self.assertIs(orbit_paths.simplify(self.circle, 0.0), self.circle)
+
+    def test_straight_line_collapses_to_endpoints(self):
+        line = np.column_stack([np.linspace(0, 1, 50)] * 3)
+        np.testing.assert_array_equal(orbit_paths.simplify(line, 1e-9), line[[0, -1]])
+
+    def test_point_count_falls_with_tolerance(self):
+        counts = [len(orbit_paths.simplify(self.circle, tol)) for tol in (1e-4, 1e-3, 1e-2)]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertLess(counts[0], len(self.circle))
+        # Fewest chords of a unit circle with sagitta <= 0.01; RDP is not optimal.
+        optimum = int(np.ceil(2 * np.pi / (2 * np.arccos(1 - 1e-2)))) + 1
+        self.assertGreaterEqual(counts[-1], optimum)
+        self.assertLess(counts[-1], 2 * optimum)
+
+    def test_stays_within_tolerance(self):
+        for tol in (1e-4, 1e-3, 1e-2):
+            simplified = orbit_paths.simplify(self.circle, tol)
+            np.testing.assert_array_equal(simplified[0], self.circle[0])
+            np.testing.assert_array_equal(simplified[-1], self.circle[-1])
+            self.assertLessEqual(_max_deviation(self.circle, simplified), tol + 1e-12)
+
+
+class MeteorShowerOccurrenceTests(SimpleTestCase):
+    def occurrence(self, code, on, next_peak=False):
+        index = meteor_showers._INDEX_BY_CODE[code]
+        return tuple(d.isoformat() for d in meteor_showers._occurrence(index, date.fromisoformat(on), next_peak))
+
+    def test_quadrantids_start_the_year_before_their_peak(self):
+        current = ('2026-12-28', '2027-01-03', '2027-01-12')
+        self.assertEqual(self.occurrence('QUA', '2026-12-20'), current)
+        self.assertEqual(self.occurrence('QUA', '2026-12-30'), current)
+        self.assertEqual(self.occurrence('QUA', '2027-01-05'), current)
+        self.assertEqual(self.occurrence('QUA', '2027-01-05', next_peak=True),
+                         ('2027-12-28', '2028-01-03', '2028-01-12'))
+
+    def test_december_leonis_minorids_end_the_year_after_their_peak(self):
+        current = ('2026-12-05', '2026-12-20', '2027-02-04')
+        self.assertEqual(self.occurrence('DLM', '2026-12-10'), current)
+        self.assertEqual(self.occurrence('DLM', '2027-01-15'), current)
+        self.assertEqual(self.occurrence('DLM', '2027-01-15', next_peak=True),
+                         ('2027-12-05', '2027-12-20', '2028-02-04'))
+        self.assertEqual(self.occurrence('DLM', '2027-02-05'), ('2027-12-05', '2027-12-20', '2028-02-04'))
+
+    def test_upcoming_peaks_are_ordered_and_ahead(self):
+        on = date(2025, 8, 20)
+        entries = meteor_showers.upcoming(on, len(meteor_showers.SHOWER_CATALOG))
+        peaks = [e['peak'] for e in entries]
+        self.assertEqual(peaks, sorted(peaks))
+        self.assertTrue(all(e['days_to_peak'] >= 0 for e in entries))
+
+    def test_active_includes_showers_past_their_peak(self):
+        codes = [e['code'] for e in meteor_showers.active(date(2027, 1, 15))]
+        self.assertIn('DLM', codes)
+        self.assertNotIn('QUA', codes)
+
+    def test_next_peak_is_a_major_shower(self):
+        self.assertEqual(meteor_showers.next_peak(datetime(2026, 10, 11)),
+                         {'name': 'Orionids', 'date': '2026-10-21'})
+        self.assertEqual(meteor_showers.next_peak(datetime(2026, 12, 23)),
+                         {'name': 'Quadrantids', 'date': '2027-01-03'})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OrbitPositionsApiTests(SimpleTestCase):
+    url = '/api/orbit-positions/'
+
+    def test_json_is_the_default(self):
+        response = self.client.get(self.url, {'date': '2026-01-30', 'days': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], encoding.JSON_CONTENT_TYPE)
+        self.assertIn('Accept', response['Vary'])
+        payload = response.json()
+        self.assertEqual(payload['date'], '2026-01-30')
+        self.assertEqual([f['date'] for f in payload['frames']], ['2026-01-30', '2026-01-31', '2026-02-01'])
+
+    def test_packed_by_accept_header_and_format(self):
+        json_payload = self.client.get(self.url, {'date': '2026-01-30', 'days': 3, 'step': 2}).json()
+        for response in (
+            self.client.get(self.url, {'date': '2026-01-30', 'days': 3, 'step': 2},
+                            HTTP_ACCEPT=encoding.PACKED_CONTENT_TYPE),
+            self.client.get(self.url, {'date': '2026-01-30', 'days': 3, 'step': 2, 'format': 'bin'}),
+        ):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], encoding.PACKED_CONTENT_TYPE)
+            self.assertIn('Accept', response['Vary'])
+            unpacked = encoding.unpack_positions(response.content)
+            self.assertEqual(unpacked['dates'], ['2026-01-30', '2026-02-01', '2026-02-03'])
+            self.assertEqual(unpacked['names'], list(json_payload['positions']))
+            np.testing.assert_allclose(
+                unpacked['angles'][0], [p['angle'] for p in json_payload['positions'].values()], atol=1e-6)
+
+    def test_out_of_range_timeline_is_rejected(self):
+        for params in ({'days': 0}, {'days': 100000}, {'step': 0}, {'step': 'x'},
+                       {'days': 10, 'step': 10 ** 12}, {'days': 3660, 'step': 365}):
+            with self.subTest(**params):
+                response = self.client.get(self.url, {'date': '2026-01-30', **params})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+class ApiCompressionMiddlewareTests(SimpleTestCase):
+    def respond(self, response, accept='gzip, deflate'):
+        middleware = ApiCompressionMiddleware(lambda request: response)
+        request = RequestFactory().get('/api/', HTTP_ACCEPT_ENCODING=accept)
+        return middleware(request)
+
+    def test_large_json_is_gzipped(self):
+        body = encoding.dumps_json_bytes({'values': list(range(2000))})
+        response = encoding.FastJsonResponse({'values': list(range(2000))})
+        response['ETag'] = '"abc"'
+        response = self.respond(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_html_is_left_alone(self):
+        html = '<p>' + 'x' * 5000 + '</p>'
+        response = self.respond(HttpResponse(html, content_type='text/html; charset=utf-8'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+        self.assertEqual(response.content.decode(), html)
+
+    def test_small_json_is_left_alone(self):
+        response = self.respond(encoding.FastJsonResponse({'ok': True}))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(response.content), {'ok': True})
+
+    def test_identity_when_not_accepted(self):
+        response = self.respond(encoding.FastJsonResponse({'values': list(range(2000))}), accept='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExportEphemerisTests(SimpleTestCase):
+    def test_exported_files_match_the_api(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command('export_ephemeris', start='2026-01-30', days=3, workers=1, chunk_days=2,
+                         output=tmp, stdout=io.StringIO())
+            root = Path(tmp)
+            version = json.loads((root / 'index.json').read_bytes())['version']
+            exported = root / version
+            self.assertEqual(sorted(p.name for p in root.iterdir()), sorted([version, 'index.json']))
+
+            for stamp in ('2026-01-30', '2026-01-31', '2026-02-01'):
+                response = self.client.get('/api/orbit-positions/', {'date': stamp})
+                self.assertEqual((exported / 'orbit-positions' / f'{stamp}.json').read_bytes(), response.content)
+                for planet_id in views.PLANET_FACTS:
+                    with self.subTest(planet=planet_id, date=stamp):
+                        response = self.client.get('/api/planet-info/', {'planet': planet_id, 'date': stamp})
+                        path = exported / 'planet-info' / planet_id / f'{stamp}.json'
+                        self.assertEqual(path.read_bytes(), response.content)
+
+
+NOAA_KP_URL = 'https://services.swpc.noaa.gov/products/noaa-planetary-k-index-forecast.json'
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PLANETS_UPSTREAM_MODE='replay')
+class UpstreamReplayTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        fixtures = override_settings(PLANETS_UPSTREAM_FIXTURES=tmp.name)
+        fixtures.enable()
+        self.addCleanup(fixtures.disable)
+        # Both cache tiers outlive a test; start from empty ones.
+        caches['default'].clear()
+        tiered_cache.local.clear()
+        self.addCleanup(tiered_cache.local.clear)
+
+    def test_present_fixture_is_returned(self):
+        upstream._save_fixture('http', 'https://example.org/a.json', '{"a": 1}')
+        self.assertEqual(upstream.fetch_text('https://example.org/a.json'), '{"a": 1}')
+        upstream._save_fixture('horizons', json.dumps(['90000091', '500@399', '1d']), {'Tmag': '11.2'})
+        row = upstream.horizons_ephemeris_row('90000091', '500@399', '2030-05-01', '2030-05-02', '1d')
+        self.assertEqual(row, {'Tmag': '11.2'})
+
+    def test_missing_fixture_is_unavailable(self):
+        with self.assertRaises(upstream.UpstreamUnavailable):
+            upstream.fetch_text('https://example.org/missing.json')
+        with self.assertRaises(upstream.UpstreamUnavailable):
+            upstream.horizons_ephemeris_row('90000001', '500@399', '2030-05-01', '2030-05-02', '1d')
+
+    def test_space_weather_reports_missing_fixture(self):
+        response = self.client.get('/api/space-weather/')
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertIsNone(payload['next_predicted_geomagnetic_storm_utc'])
+        self.assertIn('no recorded fixture', payload['error'])
+
+    def test_space_weather_from_fixture(self):
+        rows = [['time_tag', 'kp'], ['2000-01-01T00:00:00', '7.00'], ['2999-01-01T03:00:00', '3.00'],
+                ['2999-01-01T06:00:00', '5.33']]
+        upstream._save_fixture('http', NOAA_KP_URL, json.dumps(rows))
+        payload = self.client.get('/api/space-weather/').json()
+        self.assertEqual(payload['next_predicted_geomagnetic_storm_utc'], '2999-01-01T06:00:00')
+        self.assertNotIn('error', payload)
+
+
+class ProfilerAccessTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        profiler_settings = override_settings(PLANETS_PROFILER_SECRET='profiler-test-secret',
+                                              PLANETS_PROFILER_DIR=str(self.root / 'profiles'))
+        profiler_settings.enable()
+        self.addCleanup(profiler_settings.disable)
+
+        profiler = cProfile.Profile()
+        profiler.runcall(sum, range(10))
+        request = RequestFactory().get('/api/orbit-positions/')
+        self.profile_id = profiling.save_profile(profiler, request, HttpResponse(), 0.01)
+
+    def get(self, path, token=None, **params):
+        headers = {} if token is None else {'HTTP_X_PLANETS_PROFILE': token}
+        return self.client.get(path, params, **headers)
+
+    def test_valid_token(self):
+        response = self.get('/api/profiles/', profiling.make_token())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.json()['profiles']], [self.profile_id])
+        response = self.get(f'/api/profiles/{self.profile_id}/', profiling.make_token())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('function calls', response.content.decode())
+
+    def test_rejected_tokens(self):
+        with mock.patch('time.time', return_value=time.time() - 8 * 24 * 3600):
+            expired = profiling.make_token()
+        secret_key_token = signing.dumps('profile', salt=profiling.TOKEN_SALT)
+        for token in (None, '', 'garbage', secret_key_token, expired):
+            with self.subTest(token=token):
+                self.assertEqual(self.get('/api/profiles/', token).status_code, 403)
+                self.assertEqual(self.get(f'/api/profiles/{self.profile_id}/', token).status_code, 403)
+
+    def test_query_string_token_is_ignored(self):
+        self.assertEqual(self.client.get('/api/profiles/', {'token': profiling.make_token()}).status_code, 403)
+
+    @override_settings(PLANETS_PROFILER_SECRET=None)
+    def test_no_secret_means_no_access(self):
+        with self.assertRaises(ImproperlyConfigured):
+            profiling.make_token()
+        token = signing.dumps('profile', key='', salt=profiling.TOKEN_SALT)
+        self.assertEqual(self.get('/api/profiles/', token).status_code, 403)
+
+    def test_profile_path_stays_in_its_directory(self):
+        (self.root / 'x.prof').write_bytes(b'')
+        self.assertIsNotNone(profiling.profile_path(self.profile_id))
+        for profile_id in ('../x', '..\\x', '.hidden', '', 'missing'):
+            with self.subTest(profile_id=profile_id):
+                self.assertIsNone(profiling.profile_path(profile_id))
+
+
+class TieredCacheTestsMixin:
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = TieredCache(local_ttl=300)
+
+    def test_value_round_trip(self):
+        values = [
+            {'small': [1, 2.5, None, 'x']},
+            {'large': list(range(1000)), 'nested': {'a': [0.1] * 100}},
+            np.arange(12, dtype='<f4').reshape(3, 4),
+        ]
+        for value, tag in zip(values, (b'j', b'z', b'n')):
+            data = caching.dumps_value(value)
+            self.assertEqual(data[:1], tag)
+            loaded = caching.loads_value(data)
+            if isinstance(value, np.ndarray):
+                self.assertEqual(loaded.dtype, value.dtype)
+                np.testing.assert_array_equal(loaded, value)
+            else:
+                self.assertEqual(loaded, value)
+        with self.assertRaises(ValueError):
+            caching.loads_value(b'?junk')
+
+    def test_keys_carry_the_ephemeris_version(self):
+        self.cache.set('ns', 'key', {'v': 1}, timeout=60)
+        full_key = f'planets:{caching.ephemeris_version()}:ns:key'
+        self.assertEqual(caching.loads_value(caches['default'].get(full_key)), {'v': 1})
+        # A fresh process (empty local tier) reads it back from the shared tier.
+        self.assertEqual(TieredCache().get('ns', 'key'), {'v': 1})
+
+    def test_local_tier_never_outlives_local_ttl(self):
+        now = time.monotonic()
+        with mock.patch('planets.caching.time.monotonic', return_value=now):
+            self.cache.set('ns', 'long', 'value', timeout=30 * 24 * 3600)
+            self.cache.set('ns', 'short', 'value', timeout=10)
+        full_key = self.cache._key('ns', 'long')
+        with mock.patch('planets.caching.time.monotonic', return_value=now + 60):
+            self.assertIs(self.cache.local.get(self.cache._key('ns', 'short')), caching._MISSING)
+            self.assertEqual(self.cache.local.get(full_key), 'value')
+        with mock.patch('planets.caching.time.monotonic', return_value=now + 301):
+            self.assertIs(self.cache.local.get(full_key), caching._MISSING)
+            # Still served from the shared tier.
+            self.assertEqual(self.cache.get('ns', 'long'), 'value')
+
+    def test_get_or_compute_with_callable_timeout(self):
+        calls, seen = [], []
+
+        def compute(x):
+            calls.append(x)
+            return {'name': None} if x == 'fail' else {'name': x}
+
+        def timeout(result):
+            seen.append(result)
+            return 300 if result['name'] is None else 6 * 3600
+
+        with mock.patch.object(self.cache, 'set', wraps=self.cache.set) as spy:
+            self.assertEqual(self.cache.get_or_compute('ns', 'ok', compute, 'ok', timeout=timeout), {'name': 'ok'})
+            self.assertEqual(self.cache.get_or_compute('ns', 'ok', compute, 'ok', timeout=timeout), {'name': 'ok'})
+            self.cache.get_or_compute('ns', 'fail', compute, 'fail', timeout=timeout)
+        self.assertEqual(calls, ['ok', 'fail'])
+        self.assertEqual(seen, [{'name': 'ok'}, {'name': None}])
+        self.assertEqual([c.args[3] for c in spy.call_args_list], [6 * 3600, 300])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TieredCacheLocmemTests(TieredCacheTestsMixin, SimpleTestCase):
+    pass
+
+
+class TieredCacheFileTests(TieredCacheTestsMixin, SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        file_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp.name,
+        }})
+        file_cache.enable()
+        self.addCleanup(file_cache.disable)
+        super().setUp()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DistanceSeriesApiTests(SimpleTestCase):
+    url = '/api/distance-series/'
+
+    def test_series(self):
+        response = self.client.get(self.url, {'planet': 'mars', 'start': '2026-01-01', 'end': '2026-01-05', 'step': '1d'})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(len(payload['times']), 5)
+        self.assertEqual(len(payload['distance_km']), 5)
+
+    def test_outside_the_ephemeris_is_rejected(self):
+        for start, end in (('3000-01-01', '3000-01-05'), ('1200-01-01', '1200-01-02'), ('2026-01-01', '9000-01-01')):
+            with self.subTest(start=start, end=end):
+                response = self.client.get(self.url, {'planet': 'mars', 'start': start, 'end': end, 'step': '1000d'})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ephemeris', response.json()['error'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DistanceMatrixApiTests(SimpleTestCase):
+    url = '/api/distance-matrix/'
+
+    def test_instant_and_series(self):
+        payload = self.client.get(self.url, {'date': '2026-01-01'}).json()
+        self.assertEqual(len(payload['matrix']), len(payload['bodies']))
+        payload = self.client.get(self.url, {'start': '2026-01-01', 'end': '2026-01-03'}).json()
+        self.assertEqual(len(payload['times']), 3)
+        self.assertEqual(len(payload['distances']), 3)
+
+    def test_outside_the_ephemeris_is_rejected(self):
+        for params in ({'date': '3000-01-01'}, {'date': '1200-01-01T12:00'},
+                       {'start': '3000-01-01', 'end': '3000-01-05'}, {'start': '2026-01-01', 'end': '4000-01-01', 'step': '1000d'}):
+            with self.subTest(**params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ephemeris', response.json()['error'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OrbitPathsApiTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        tiered_cache.local.clear()
+        self.addCleanup(tiered_cache.local.clear)
+
+    def test_ephemeris_is_sampled_once_for_every_lod(self):
+        with mock.patch('planets.orbit_paths.sample_orbit', wraps=orbit_paths.sample_orbit) as sample_orbit:
+            payloads = {lod: self.client.get('/api/orbit-paths/', {'lod': lod}).json()
+                        for lod in orbit_paths.LOD_TOLERANCES}
+        self.assertEqual(sample_orbit.call_count, len(views.PLANET_ORDER))
+        counts = [len(payloads[lod]['paths']['mars']['points']) for lod in sorted(payloads)]
+        self.assertEqual(counts[0], orbit_paths.SAMPLES_PER_ORBIT)
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_levels_match_from_the_shared_tier(self):
+        fresh = self.client.get('/api/orbit-paths/', {'lod': 2}).content
+        # Another instance: only the shared tier (samples stored as JSON) is warm.
+        tiered_cache.local.clear()
+        caches['default'].delete(tiered_cache._key('orbit-paths', 'lod2'))
+        self.assertEqual(self.client.get('/api/orbit-paths/', {'lod': 2}).content, fresh)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MeteorShowersApiTests(SimpleTestCase):
+    url = '/api/meteor-showers/'
+
+    def test_visibility_for_an_observer(self):
+        payload = self.client.get(self.url, {'date': '2026-08-01', 'lat': 42.2, 'lon': -8.7}).json()
+        self.assertEqual(payload['upcoming'][0]['code'], 'PER')
+        self.assertIsNotNone(payload['upcoming'][0]['visibility'])
+
+    def test_peak_nights_outside_the_ephemeris_have_no_visibility(self):
+        _, bodies = views._get_skyfield()
+        last_jd = orbit_paths.ephemeris_coverage(bodies)[1]
+        # Seven weeks before the end of the kernel: early peaks are covered, later ones are not.
+        day = views.SKYFIELD_TS.tt_jd(last_jd - 50).utc_datetime().strftime('%Y-%m-%d')
+        response = self.client.get(self.url, {'date': day, 'count': 10, 'lat': 42.2, 'lon': -8.7})
+        self.assertEqual(response.status_code, 200)
+        visibility = [e['visibility'] for e in response.json()['upcoming']]
+        self.assertIsNotNone(visibility[0])
+        self.assertIsNone(visibility[-1])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TonightApiTests(SimpleTestCase):
+    url = '/api/tonight/'
+
+    def post(self, body):
+        return self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+    def test_batch(self):
+        response = self.post({'date': '2026-03-01', 'observers': [{'id': 'vigo', 'lat': 42.24, 'lon': -8.72},
+                                                                   {'lat': -33.9, 'lon': 151.2}]})
+        self.assertEqual(response.status_code, 200)
+        observers = response.json()['observers']
+        self.assertEqual([o['id'] for o in observers], ['vigo', None])
+        self.assertTrue(all(o['observing_time'] for o in observers))
+
+    def test_date_outside_the_ephemeris_is_rejected(self):
+        for day in ('2060-01-01', '1800-01-01'):
+            with self.subTest(day=day):
+                response = self.post({'date': day, 'observers': [{'lat': 1, 'lon': 2}]})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ephemeris', response.json()['error'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SkyApiTests(SimpleTestCase):
+    url = '/api/sky/'
+
+    def test_altaz_is_for_the_requested_time(self):
+        params = {'lat': 42.24, 'lon': -8.72, 'mag': 1.0}
+        early = self.client.get(self.url, {'time': '2026-03-01T22:00:00', **params}).json()
+        late = self.client.get(self.url, {'time': '2026-03-01T22:04:59', **params}).json()
+        self.assertEqual(early['radec_time'], late['radec_time'])
+        self.assertEqual(late['time'], '2026-03-01T22:04:59Z')
+        self.assertEqual(early['stars']['ra_deg'], late['stars']['ra_deg'])
+        # About 1.25 degrees of Earth rotation apart.
+        self.assertGreater(abs(early['stars']['az_deg'][0] - late['stars']['az_deg'][0]), 0.3)
+
+        ts, bodies = views._get_skyfield()
+        i = late['stars']['name'].index('Sirius')
+        row = bright_stars.catalog()[list(bright_stars.catalog()['name']).index('Sirius')]
+        star = Star(ra=Angle(degrees=float(row['ra_deg'])), dec=Angle(degrees=float(row['dec_deg'])))
+        t = ts.utc(2026, 3, 1, 22, 4, 59)
+        alt, az, _ = (bodies['earth'] + wgs84.latlon(42.24, -8.72)).at(t).observe(star).apparent().altaz()
+        self.assertAlmostEqual(late['stars']['alt_deg'][i], alt.degrees, delta=0.01)
+        self.assertAlmostEqual(late['stars']['az_deg'][i], az.degrees, delta=0.01)
+
+    def test_time_outside_the_ephemeris_is_rejected(self):
+        for when in ('3000-01-01', '1800-01-01T00:00'):
+            with self.subTest(time=when):
+                response = self.client.get(self.url, {'time': when})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ephemeris', response.json()['error'])
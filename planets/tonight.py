@@ -0,0 +1,102 @@
+"""Evening sky summaries ("what's up tonight") for many observers at once.
+
+All observers share one UTC time grid. The Sun's and planets' apparent
+RA/Dec and the planets' magnitudes are computed once over that grid with
+array-valued Skyfield calls (geocentric; parallax is negligible for the
+Sun and planets). Altitudes for every observer then come from
+planets.sky.altaz as a single (observers x instants) broadcast.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from skyfield.magnitudelib import planetary_magnitude
+
+from . import sky
+
+
+SUNSET_ALTITUDE = -0.8333
+# Planets are reported at civil dusk, the first moment they are easy to see.
+DUSK_SUN_ALTITUDE = -6.0
+GRID_STEP_MINUTES = 5
+# 00:00 UTC on the day to 12:00 UTC the next day covers local noon to past
+# dusk for every longitude.
+GRID_HOURS = 36
+
+
+def time_grid(ts, day: datetime):
+    """Shared grid starting at ``day`` 00:00 UTC, GRID_STEP_MINUTES apart."""
+    minutes = np.arange(0, GRID_HOURS * 60 + 1, GRID_STEP_MINUTES)
+    return ts.utc(day.year, day.month, day.day, 0, minutes)
+
+
+def _stamp(day: datetime, minutes: float) -> str:
+    return (day + timedelta(minutes=float(minutes))).strftime('%Y-%m-%dT%H:%MZ')
+
+
+def evening_sky(ts, bodies, planets, lats, lons, day: datetime):
+    """One summary dict per observer, in input order.
+
+    ``planets`` is a list of (planet_id, skyfield key); ``lats``/``lons`` are
+    sequences of degrees (east-positive); ``day`` is a UTC midnight.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    t = time_grid(ts, day)
+    minutes = np.arange(len(t)) * GRID_STEP_MINUTES
+    gast = t.gast
+    earth = bodies['earth']
+
+    sun_ra, sun_dec, _ = earth.at(t).observe(bodies['sun']).apparent().radec(epoch='date')
+    sun_alt, _ = sky.altaz(sun_ra._degrees, sun_dec.degrees, lats[:, None], lons[:, None], gast)
+
+    # Only instants after each observer's local (mean solar) noon count as "tonight".
+    noon = (12.0 - lons / 15.0) * 60.0
+    afternoon = minutes[None, :] >= noon[:, None]
+    has_dusk = (afternoon & (sun_alt < DUSK_SUN_ALTITUDE)).any(axis=1)
+    dusk = (afternoon & (sun_alt < DUSK_SUN_ALTITUDE)).argmax(axis=1)
+    down = afternoon & (sun_alt < SUNSET_ALTITUDE)
+    set_idx = down.argmax(axis=1)
+    # A sunset needs the Sun up at the previous sample (not polar night or day).
+    rows = np.arange(len(lats))
+    prev_idx = np.maximum(set_idx - 1, 0)
+    has_sunset = down.any(axis=1) & (set_idx > 0) & (sun_alt[rows, prev_idx] >= SUNSET_ALTITUDE)
+    a0, a1 = sun_alt[rows, prev_idx], sun_alt[rows, set_idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(a0 != a1, (a0 - SUNSET_ALTITUDE) / (a0 - a1), 0.0)
+    sunset_minutes = (prev_idx + np.clip(frac, 0.0, 1.0)) * GRID_STEP_MINUTES
+
+    ra, dec, mag = [], [], []
+    for _, sf_key in planets:
+        astrometric = earth.at(t).observe(bodies[sf_key])
+        p_ra, p_dec, _ = astrometric.apparent().radec(epoch='date')
+        ra.append(p_ra._degrees)
+        dec.append(p_dec.degrees)
+        try:
+            mag.append(np.asarray(planetary_magnitude(astrometric), dtype=float))
+        except ValueError:
+            mag.append(np.full(len(t), np.nan))
+    ra, dec, mag = np.array(ra), np.array(dec), np.array(mag)
+
+    # Planet positions at each observer's dusk: shape (planets, observers).
+    alt, az = sky.altaz(ra[:, dusk], dec[:, dusk], lats[None, :], lons[None, :], gast[dusk][None, :])
+    mag_at = mag[:, dusk]
+
+    results = []
+    for i in range(len(lats)):
+        entry = {
+            'sunset': _stamp(day, sunset_minutes[i]) if has_sunset[i] else None,
+            'observing_time': _stamp(day, minutes[dusk[i]]) if has_dusk[i] else None,
+            'planets': [],
+        }
+        if has_dusk[i]:
+            for p, (planet_id, _) in enumerate(planets):
+                if alt[p, i] <= 0.0:
+                    continue
+                entry['planets'].append({
+                    'planet': planet_id,
+                    'altitude_deg': round(float(alt[p, i]), 1),
+                    'azimuth_deg': round(float(az[p, i]), 1),
+                    'magnitude': None if np.isnan(mag_at[p, i]) else round(float(mag_at[p, i]), 1),
+                })
+        results.append(entry)
+    return results
@@ -0,0 +1,145 @@
+"""Access to external services (NOAA SWPC, JPL SBDB, JPL Horizons).
+
+Every upstream call goes through this module so it can be recorded and
+replayed. PLANETS_UPSTREAM_MODE selects the behaviour:
+
+* ``live`` (default) – call the real services.
+* ``record`` – call the real services and store each response as a fixture
+  under PLANETS_UPSTREAM_FIXTURES.
+* ``replay`` – answer only from fixtures; a missing fixture behaves like an
+  unreachable host.
+* ``standin`` – fetch fixtures from the local stand-in server
+  (``manage.py upstream_standin``) at PLANETS_UPSTREAM_STANDIN_URL, which can
+  inject latency and failures. Requests use the same timeouts as live calls.
+
+Fixtures are JSON files ``<fixtures>/<kind>/<key>.json`` where ``kind`` is
+``http`` or ``horizons`` and ``key`` is a hash of the request. Horizons keys
+leave out the dates, so a recording keeps answering on later days. A small
+set is committed under ``upstream_fixtures/`` for offline runs.
+"""
+import hashlib
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    from astroquery.jplhorizons import Horizons
+    ASTROQUERY_AVAILABLE = True
+except Exception:
+    Horizons = None
+    ASTROQUERY_AVAILABLE = False
+
+
+MODES = ('live', 'record', 'replay', 'standin')
+
+# Ephemeris columns the comet picker reads (magnitudes and elongation).
+HORIZONS_COLUMNS = ('Tmag', 'Nmag', 'V', 'Vmag', 'mag', 'elong', 'elongation', 'EL', 'Elong')
+
+
+class UpstreamUnavailable(urllib.error.URLError):
+    """No response available (missing fixture, stand-in failure)."""
+
+
+def get_mode() -> str:
+    mode = getattr(settings, 'PLANETS_UPSTREAM_MODE', 'live')
+    if mode not in MODES:
+        raise ValueError(f'PLANETS_UPSTREAM_MODE must be one of {MODES}, not {mode!r}')
+    return mode
+
+
+def horizons_available() -> bool:
+    """Whether Horizons lookups can be answered in the current mode."""
+    return ASTROQUERY_AVAILABLE or get_mode() in ('replay', 'standin')
+
+
+def fixture_key(kind: str, request: str) -> str:
+    return hashlib.sha1(f'{kind}:{request}'.encode('utf-8')).hexdigest()[:20]
+
+
+def fixtures_dir() -> Path:
+    default = Path(getattr(settings, 'BASE_DIR', Path.cwd())) / 'upstream_fixtures'
+    return Path(getattr(settings, 'PLANETS_UPSTREAM_FIXTURES', None) or default)
+
+
+def fixture_path(kind: str, request: str) -> Path:
+    return fixtures_dir() / kind / f'{fixture_key(kind, request)}.json'
+
+
+def _save_fixture(kind: str, request: str, body, **extra):
+    path = fixture_path(kind, request)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    envelope = {'kind': kind, 'request': request, **extra, 'body': body}
+    path.write_text(json.dumps(envelope, ensure_ascii=False, indent=1), encoding='utf-8')
+
+
+def _load_fixture(kind: str, request: str, timeout: float):
+    if get_mode() == 'standin':
+        base = getattr(settings, 'PLANETS_UPSTREAM_STANDIN_URL', 'http://127.0.0.1:8765').rstrip('/')
+        url = f'{base}/{kind}/{fixture_key(kind, request)}'
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as resp:
+                envelope = json.loads(resp.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            raise UpstreamUnavailable(f'stand-in returned HTTP {e.code} for {kind} {request}')
+        return envelope['body']
+
+    path = fixture_path(kind, request)
+    try:
+        envelope = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        raise UpstreamUnavailable(f'no recorded fixture for {kind} {request}')
+    return envelope['body']
+
+
+def _live_fetch_text(url: str, timeout: float) -> str:
+    req = urllib.request.Request(
+        url,
+        headers={
+            'User-Agent': 'planets_web (Django)',
+            'Accept': 'text/plain, application/json;q=0.9, */*;q=0.8',
+        },
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        charset = resp.headers.get_content_charset() or 'utf-8'
+        return resp.read().decode(charset, errors='replace')
+
+
+def fetch_text(url: str, timeout: float = 6.0) -> str:
+    """GET ``url`` and return the decoded body."""
+    mode = get_mode()
+    if mode in ('replay', 'standin'):
+        return _load_fixture('http', url, timeout)
+    text = _live_fetch_text(url, timeout)
+    if mode == 'record':
+        _save_fixture('http', url, text)
+    return text
+
+
+def horizons_ephemeris_row(horizons_id: str, location: str, start: str, stop: str, step: str,
+                           timeout: float = 10.0):
+    """First ephemeris row from JPL Horizons as ``{column: str}``, or None.
+
+    Only HORIZONS_COLUMNS are kept; masked values come back as '--' (the same
+    text astropy renders for them).
+    """
+    mode = get_mode()
+    # The picker only needs a rough magnitude and elongation, so a row recorded
+    # on one day is a fair answer for any other.
+    request = json.dumps([horizons_id, location, step])
+    if mode in ('replay', 'standin'):
+        return _load_fixture('horizons', request, timeout)
+
+    obj = Horizons(id=horizons_id, location=location, epochs={'start': start, 'stop': stop, 'step': step})
+    ephem = obj.ephemerides()
+    if ephem is None or len(ephem) == 0:
+        row = None
+    else:
+        first = ephem[0]
+        cols = first.colnames if hasattr(first, 'colnames') else []
+        row = {col: str(first[col]) for col in cols if col in HORIZONS_COLUMNS}
+    if mode == 'record':
+        _save_fixture('horizons', request, row, epochs=[start, stop])
+    return row
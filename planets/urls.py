@@ -8,4 +8,12 @@ urlpatterns = [
     path('api/planet-info/', views.planet_info_api, name='planet_info_api'),
     path('api/space-weather/', views.space_weather_api, name='space_weather_api'),
     path('api/orbit-positions/', views.orbit_positions_api, name='orbit_positions_api'),
+    path('api/distance-series/', views.distance_series_api, name='distance_series_api'),
+    path('api/distance-matrix/', views.distance_matrix_api, name='distance_matrix_api'),
+    path('api/orbit-paths/', views.orbit_paths_api, name='orbit_paths_api'),
+    path('api/meteor-showers/', views.meteor_showers_api, name='meteor_showers_api'),
+    path('api/tonight/', views.tonight_batch_api, name='tonight_batch_api'),
+    path('api/sky/', views.sky_api, name='sky_api'),
+    path('api/profiles/', views.profile_list_api, name='profile_list_api'),
+    path('api/profiles/<str:profile_id>/', views.profile_detail_api, name='profile_detail_api'),
 ]
@@ -1,22 +1,23 @@
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from django.http import FileResponse, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from . import bright_stars, encoding, ephemeris, meteor_showers, orbit_paths, profiling, sky, tonight, upstream
+from .encoding import FastJsonResponse
+from . import planets_distance
 from .planets_distance import get_distance
-from skyfield.api import load, utc
+from .caching import tiered_cache
+from .singleflight import single_flight
+from skyfield.api import load, utc, wgs84
 from skyfield import almanac
-try:
-    from astroquery.jplhorizons import Horizons
-    ASTROQUERY_AVAILABLE = True
-except Exception:
-    Horizons = None
-    ASTROQUERY_AVAILABLE = False
+import hashlib
 import math
 import json
+import numpy as np
 from datetime import datetime, timedelta
 import re
-from pathlib import Path
-import urllib.request
 import urllib.error
 
 
@@ -31,12 +32,9 @@ def _get_skyfield():
     if SKYFIELD_TS is None:
         SKYFIELD_TS = load.timescale()
     if SKYFIELD_BODIES is None:
-        base_dir = Path(getattr(settings, 'BASE_DIR', Path.cwd()))
         # Prefer the ephemeris file shipped with this project.
-        eph_path = base_dir / 'de421.bsp'
-        if not eph_path.exists():
-            eph_path = base_dir / 'de440.bsp'
-        if eph_path.exists():
+        eph_path = ephemeris.ephemeris_path()
+        if eph_path is not None:
             SKYFIELD_BODIES = load(str(eph_path))
         else:
             # Last resort: let Skyfield download de421.bsp into its cache directory.
@@ -203,27 +201,20 @@ def _planet_sf_key(planet_id: str):
     }.get(planet_id)
 
 
-def _heliocentric_angle_rad(ts, bodies, planet_id: str, when_dt):
-    sf_key = _planet_sf_key(planet_id)
-    if not sf_key:
-        raise KeyError('unknown planet')
-    sun = bodies['sun']
-    t = ts.from_datetime(when_dt)
-    vec = sun.at(t).observe(bodies[sf_key]).position.km
-    return math.atan2(vec[1], vec[0])
+J2000_DATE = datetime(2000, 1, 1, tzinfo=utc)
 
+# Ephemeris-derived values for a fixed date never change (keys carry the ephemeris version).
+EPHEMERIS_CACHE_SECONDS = 30 * 24 * 3600
 
-@require_GET
-def planet_info_api(request):
-    planet_id = (request.GET.get('planet') or '').strip().lower()
-    if planet_id not in PLANET_FACTS:
-        return JsonResponse({'error': 'Unknown planet.'}, status=400)
 
-    date_str = request.GET.get('date')
-    selected_date = _parse_date_utc(date_str)
+def _year_progress(angle_now: float, angle_ref: float) -> float:
+    """Fraction (0..1) of an orbit travelled between two heliocentric angles."""
+    two_pi = math.pi * 2
+    delta = (angle_now - angle_ref) % two_pi
+    return delta / two_pi
 
-    ts, bodies = _get_skyfield()
 
+def _planet_info_payload(planet_id: str, selected_date: datetime, year_progress: float):
     facts = PLANET_FACTS[planet_id]
     day_length_hours = float(facts['day_length_hours'])
     # year_length_earth_days may be None for bodies like the Sun
@@ -231,23 +222,11 @@ def planet_info_api(request):
     year_length_earth_days = float(raw_year_len) if raw_year_len is not None else None
     year_length_local_days = (year_length_earth_days * 24.0) / day_length_hours if (year_length_earth_days is not None and day_length_hours) else None
 
-    # Compute orbital progress vs a fixed reference epoch (J2000)
-    # For the Sun (or bodies without an orbital period) we provide sensible defaults.
-    if planet_id == 'sun' or year_length_earth_days is None:
-        year_progress = 0.0
-    else:
-        ref_date = datetime(2000, 1, 1, tzinfo=utc)
-        angle_now = _heliocentric_angle_rad(ts, bodies, planet_id, selected_date)
-        angle_ref = _heliocentric_angle_rad(ts, bodies, planet_id, ref_date)
-        two_pi = math.pi * 2
-        delta = (angle_now - angle_ref) % two_pi
-        year_progress = delta / two_pi  # 0..1
-
     # Day-of-year indices (1-based) when year length is known
     day_of_year_earth_days = int(math.floor(year_progress * year_length_earth_days) + 1) if year_length_earth_days is not None else None
     day_of_year_local_days = int(math.floor(year_progress * year_length_local_days) + 1) if year_length_local_days else None
 
-    payload = {
+    return {
         'planet': planet_id,
         'date': selected_date.strftime('%Y-%m-%d'),
         'day_length_hours': day_length_hours,
@@ -262,20 +241,45 @@ def planet_info_api(request):
         'composition': facts.get('composition'),
         'moons': facts['moons'],
     }
-    return JsonResponse(payload)
+
+
+def _planet_year_progress(ts, bodies, planet_id: str, selected_date: datetime) -> float:
+    # Same evaluation as export_ephemeris, so exported files match this API byte for byte.
+    i = PLANET_ORDER.index(planet_id)
+    angle_now = float(_heliocentric_angles(ts, bodies, [selected_date])[0][i])
+    angle_ref = float(_heliocentric_angles(ts, bodies, [J2000_DATE])[0][i])
+    return _year_progress(angle_now, angle_ref)
+
+
+@require_GET
+def planet_info_api(request):
+    planet_id = (request.GET.get('planet') or '').strip().lower()
+    if planet_id not in PLANET_FACTS:
+        return FastJsonResponse({'error': 'Unknown planet.'}, status=400)
+
+    date_str = request.GET.get('date')
+    selected_date = _parse_date_utc(date_str)
+
+    ts, bodies = _get_skyfield()
+
+    # Compute orbital progress vs a fixed reference epoch (J2000)
+    # For the Sun (or bodies without an orbital period) we provide sensible defaults.
+    if planet_id == 'sun' or PLANET_FACTS[planet_id].get('year_length_earth_days') is None:
+        year_progress = 0.0
+    elif date_str:
+        year_progress = tiered_cache.get_or_compute(
+            'year-progress', f'{planet_id}:{selected_date:%Y-%m-%d}',
+            _planet_year_progress, ts, bodies, planet_id, selected_date,
+            timeout=EPHEMERIS_CACHE_SECONDS,
+        )
+    else:
+        year_progress = _planet_year_progress(ts, bodies, planet_id, selected_date)
+
+    return FastJsonResponse(_planet_info_payload(planet_id, selected_date, year_progress))
 
 
 def _fetch_text_url(url: str, timeout: float = 6.0) -> str:
-    req = urllib.request.Request(
-        url,
-        headers={
-            'User-Agent': 'planets_web (Django)',
-            'Accept': 'text/plain, application/json;q=0.9, */*;q=0.8',
-        },
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        charset = resp.headers.get_content_charset() or 'utf-8'
-        return resp.read().decode(charset, errors='replace')
+    return upstream.fetch_text(url, timeout=timeout)
 
 
 def _fetch_json_url(url: str, timeout: float = 6.0):
@@ -283,13 +287,7 @@ def _fetch_json_url(url: str, timeout: float = 6.0):
     return json.loads(text)
 
 
-@require_GET
-def space_weather_api(request):
-    """Return ONLY the next predicted storm time (best-effort).
-
-    We avoid inventing dates. If NOAA SWPC forecast products are unavailable (offline, blocked,
-    format changes), we return `next_predicted_geomagnetic_storm_utc = None` and include `error`.
-    """
+def _space_weather_payload():
     retrieved_at = datetime.utcnow().replace(tzinfo=utc)
 
     payload = {
@@ -323,63 +321,172 @@ def space_weather_api(request):
     except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, ValueError, json.JSONDecodeError) as e:
         payload['error'] = f'Space weather data not available: {str(e)}'
 
-    return JsonResponse(payload)
+    return payload
+
+
+
+SPACE_WEATHER_CACHE_SECONDS = 600
+
+
+@require_GET
+def space_weather_api(request):
+    """Return ONLY the next predicted storm time (best-effort).
+
+    We avoid inventing dates. If NOAA SWPC forecast products are unavailable (offline, blocked,
+    format changes), we return `next_predicted_geomagnetic_storm_utc = None` and include `error`.
+    The NOAA lookup is shared through the tiered cache for a few minutes.
+    """
+    payload = tiered_cache.get_or_compute('space-weather', 'next-storm', _space_weather_payload,
+                                          timeout=SPACE_WEATHER_CACHE_SECONDS)
+    return FastJsonResponse(payload)
+
+
+def _schematic_radii(count: int = len(PLANET_ORDER)):
+    """Progressive SVG radii for the schematic orbits (not to scale)."""
+    # Progressive radii: smaller gaps near center, increasing outward (geometric)
+    base = 60
+    growth = 1.35
+    raw_radii = [base * (growth ** i) for i in range(count)]
+    # Scale radii so the outermost orbit nearly touches the SVG frame without overflowing.
+    svg_center = 800
+    margin = 40
+    max_allow = svg_center - margin
+    max_raw = max(raw_radii) if raw_radii else 1
+    scale = (max_allow / max_raw) if max_raw > 0 else 1
+    return [round(r * scale) for r in raw_radii]
+
+
+def _heliocentric_angles(ts, bodies, when_dts):
+    """Heliocentric x/y-plane angles for PLANET_ORDER, shape (frames, planets).
+
+    All frames are evaluated in one vectorized Skyfield call per planet.
+    """
+    t = ts.from_datetimes(list(when_dts))
+    sun_at = bodies['sun'].at(t)
+    columns = []
+    for name in PLANET_ORDER:
+        vec = sun_at.observe(bodies[_planet_sf_key(name)]).position.km
+        columns.append(np.arctan2(vec[1], vec[0]))
+    return np.stack(columns, axis=-1)
+
+
+def _positions_dict(radii, angles_row):
+    return {
+        name: {'radius': radii[i], 'angle': float(angles_row[i])}
+        for i, name in enumerate(PLANET_ORDER)
+    }
+
+
+def _orbit_positions_payload(selected_date: datetime, radii, angles_row):
+    return {
+        'date': selected_date.strftime('%Y-%m-%d'),
+        'positions': _positions_dict(radii, angles_row),
+        'radii_list': radii,
+    }
+
+
+MAX_POSITION_FRAMES = 3660
+
+
+def _within_ephemeris(ts, bodies, start: datetime, span_days: float) -> bool:
+    """Whether ``start`` .. ``start + span_days`` lies inside the kernel ``bodies``.
+
+    A day is kept free at both ends for light-time corrections.
+    """
+    coverage = orbit_paths.ephemeris_coverage(bodies)
+    if coverage is None:
+        return True
+    first, last = coverage
+    start_jd = ts.from_datetime(start).tt
+    return first + 1.0 <= start_jd and start_jd + span_days <= last - 1.0
 
 
 def orbit_positions_api(request):
     """Return heliocentric orbit positions for the given date (YYYY-MM-DD).
 
     This is used by the frontend to update planet positions without reloading the page.
+    Optional ``days``/``step`` return a timeline of ``days`` frames, ``step`` days apart.
+    JSON is the default; see planets.encoding for the compact binary formats.
     """
     date_str = request.GET.get('date')
     if date_str:
         try:
             selected_date = datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=utc)
         except Exception:
-            return JsonResponse({'error': 'Invalid date. Use YYYY-MM-DD.'}, status=400)
+            return FastJsonResponse({'error': 'Invalid date. Use YYYY-MM-DD.'}, status=400)
     else:
         selected_date = datetime.utcnow().replace(tzinfo=utc)
 
+    try:
+        days = int(request.GET.get('days') or 1)
+        step = int(request.GET.get('step') or 1)
+    except ValueError:
+        return FastJsonResponse({'error': 'days and step must be integers.'}, status=400)
+    if not (1 <= days <= MAX_POSITION_FRAMES) or step < 1:
+        return FastJsonResponse({'error': f'days must be 1..{MAX_POSITION_FRAMES} and step >= 1.'}, status=400)
+
     ts, bodies = _get_skyfield()
-    t = ts.from_datetime(selected_date)
-    sun = bodies['sun']
+    # Checked before building any timedelta: a huge step would overflow it.
+    if not _within_ephemeris(ts, bodies, selected_date, days * step):
+        return FastJsonResponse({'error': 'date + days * step must stay inside the ephemeris range.'}, status=400)
+    frame_dates = [selected_date + timedelta(days=i * step) for i in range(days)]
+    if date_str:
+        angles = tiered_cache.get_or_compute(
+            'orbit-angles', f'{date_str}:{days}:{step}',
+            _heliocentric_angles, ts, bodies, frame_dates,
+            timeout=EPHEMERIS_CACHE_SECONDS,
+        )
+    else:
+        angles = _heliocentric_angles(ts, bodies, frame_dates)
+    radii = _schematic_radii()
+
+    content_type = encoding.negotiate_content_type(request)
+    if content_type == encoding.PACKED_CONTENT_TYPE:
+        response = HttpResponse(
+            encoding.pack_positions(PLANET_ORDER, radii, angles, selected_date, step),
+            content_type=content_type,
+        )
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    payload = _orbit_positions_payload(selected_date, radii, angles[0])
+    if days > 1:
+        payload['frames'] = [
+            {'date': d.strftime('%Y-%m-%d'), 'positions': _positions_dict(radii, row)}
+            for d, row in zip(frame_dates, angles)
+        ]
 
-    planet_names = PLANET_ORDER
-    base = 60
-    growth = 1.35
-    raw_radii = [base * (growth ** i) for i in range(len(planet_names))]
-    svg_center = 800
-    margin = 40
-    max_allow = svg_center - margin
-    max_raw = max(raw_radii) if raw_radii else 1
-    scale = (max_allow / max_raw) if max_raw > 0 else 1
-    radii = [round(r * scale) for r in raw_radii]
-
-    sf_planets = {
-        'mercury': bodies['mercury'],
-        'venus': bodies['venus'],
-        'earth': bodies['earth'],
-        'mars': bodies['mars barycenter'],
-        'jupiter': bodies['jupiter barycenter'],
-        'saturn': bodies['saturn barycenter'],
-        'uranus': bodies['uranus barycenter'],
-        'neptune': bodies['neptune barycenter']
-    }
+    if content_type == encoding.MSGPACK_CONTENT_TYPE:
+        response = HttpResponse(encoding.encode_msgpack(payload), content_type=content_type)
+    else:
+        response = FastJsonResponse(payload)
+    patch_vary_headers(response, ['Accept'])
+    return response
 
-    positions = {}
-    for i, name in enumerate(planet_names):
-        vec = sun.at(t).observe(sf_planets[name]).position.km
-        angle = math.atan2(vec[1], vec[0])
-        positions[name] = {
-            'radius': radii[i],
-            'angle': angle
-        }
+@require_GET
+def profile_list_api(request):
+    """Recent request profiles (requires a signed profiler token)."""
+    if not profiling.token_is_valid(profiling.request_token(request)):
+        return FastJsonResponse({'error': 'Forbidden.'}, status=403)
+    return FastJsonResponse({'profiles': profiling.list_profiles()})
 
-    return JsonResponse({
-        'date': selected_date.strftime('%Y-%m-%d'),
-        'positions': positions,
-        'radii_list': radii,
-    })
+
+@require_GET
+def profile_detail_api(request, profile_id):
+    """pstats text for one profile, or the raw dump with ?format=prof."""
+    if not profiling.token_is_valid(profiling.request_token(request)):
+        return FastJsonResponse({'error': 'Forbidden.'}, status=403)
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        return FastJsonResponse({'error': 'Unknown profile.'}, status=404)
+    if request.GET.get('format') == 'prof':
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+    sort = request.GET.get('sort') or 'cumulative'
+    try:
+        text = profiling.render_stats(path, sort=sort)
+    except KeyError:
+        return FastJsonResponse({'error': 'Unknown sort key.'}, status=400)
+    return HttpResponse(text, content_type='text/plain; charset=utf-8')
 
 def home_view(request):       
     planets = ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune", "pluto"]
@@ -395,184 +502,519 @@ def distance_view(request, planet_name):
     except KeyError:
         return render(request, 'planets/error.html', {'message': 'Planet not found.'})
 
-def orbits(request):
-    # Procesar la fecha seleccionada
-    date_str = request.GET.get('date')
-    if date_str:
-        selected_date = datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=utc)
+
+MAX_SERIES_SAMPLES = 10000
+MAX_MATRIX_FRAMES = 2000
+_STEP_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([dhm]?)$')
+_STEP_UNITS = {'d': 'days', '': 'days', 'h': 'hours', 'm': 'minutes'}
+
+
+def _parse_step(text: str) -> timedelta:
+    """'1d', '6h', '30m' or a bare number of days."""
+    match = _STEP_RE.match(text.strip().lower())
+    if not match:
+        raise ValueError('bad step')
+    try:
+        step = timedelta(**{_STEP_UNITS[match.group(2)]: float(match.group(1))})
+    except OverflowError:
+        raise ValueError('step too large')
+    if step.total_seconds() < 60:
+        raise ValueError('step too small')
+    return step
+
+
+def _parse_instant_utc(text: str) -> datetime:
+    for fmt in ('%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=utc)
+        except ValueError:
+            continue
+    raise ValueError('bad date')
+
+
+def _distance_series_payload(planet_id: str, start: datetime, end: datetime, step: timedelta):
+    t, km, light_s, approaches = planets_distance.distance_series(planet_id, start, end, step)
+    payload = {
+        'planet': planet_id,
+        'observer': {'latitude': planets_distance.lat, 'longitude': planets_distance.lon},
+        'start': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'end': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'step_seconds': step.total_seconds(),
+        'times': t.utc_strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'distance_km': km,
+        'light_time_s': light_s,
+        'closest_approaches': [
+            {
+                'time': when.utc_strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'distance_km': dist,
+                'light_time_s': dist / planets_distance.C_KM_S,
+            }
+            for when, dist in approaches
+        ],
+    }
+    if len(km):
+        i = int(km.argmin())
+        payload['minimum'] = {'time': payload['times'][i], 'distance_km': float(km[i]), 'light_time_s': float(light_s[i])}
+    return payload
+
+
+@require_GET
+def distance_series_api(request):
+    """Distance and light-time from the observer to a planet over a time range.
+
+    ?planet=mars&start=YYYY-MM-DD[THH:MM]&end=...&step=1d|6h|30m. All samples
+    come from one vectorized Skyfield evaluation (the same kernel as distance_view);
+    local minima are reported as closest approaches, refined between samples.
+    """
+    planet_id = (request.GET.get('planet') or '').strip().lower()
+    if planet_id not in planets_distance.aliases:
+        return FastJsonResponse({'error': 'Unknown planet.'}, status=400)
+    try:
+        start = _parse_instant_utc(request.GET['start']) if request.GET.get('start') else \
+            datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=utc)
+        end = _parse_instant_utc(request.GET['end']) if request.GET.get('end') else start + timedelta(days=30)
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid date. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM.'}, status=400)
+    try:
+        step = _parse_step(request.GET.get('step') or '1d')
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid step. Use e.g. 1d, 6h or 30m (minimum 1m).'}, status=400)
+    if end < start:
+        return FastJsonResponse({'error': 'end must not be before start.'}, status=400)
+    if (end - start) / step + 1 > MAX_SERIES_SAMPLES:
+        return FastJsonResponse({'error': f'Too many samples (max {MAX_SERIES_SAMPLES}); use a larger step.'}, status=400)
+    if not _within_ephemeris(planets_distance.ts, planets_distance.bodies, start, (end - start) / timedelta(days=1)):
+        return FastJsonResponse({'error': 'start and end must stay inside the ephemeris range.'}, status=400)
+
+    key = f'{planet_id}:{start:%Y%m%dT%H%M%S}:{end:%Y%m%dT%H%M%S}:{int(step.total_seconds())}'
+    payload = tiered_cache.get_or_compute('distance-series', key, _distance_series_payload,
+                                          planet_id, start, end, step, timeout=EPHEMERIS_CACHE_SECONDS)
+    return FastJsonResponse(payload)
+
+
+def _distance_matrix_payload(start: datetime, end: datetime | None, step: timedelta | None):
+    if end is None:
+        t = planets_distance.ts.from_datetime(start)
+        names, matrix = planets_distance.distance_matrix(t)
+        return {
+            'bodies': names,
+            'time': t.utc_strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'unit': 'km',
+            'matrix': matrix,
+        }
+
+    # Compact series: only the upper triangle, one row of pair distances per time.
+    t = planets_distance.time_range(start, end, step)
+    names, matrix = planets_distance.distance_matrix(t)
+    rows, cols = np.triu_indices(len(names), k=1)
+    return {
+        'bodies': names,
+        'unit': 'km',
+        'pairs': np.stack([rows, cols], axis=1),
+        'times': t.utc_strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'distances': matrix[rows, cols].T,
+    }
+
+
+@require_GET
+def distance_matrix_api(request):
+    """Geometric distances between every pair of bodies in planets_distance.aliases.
+
+    ?date=YYYY-MM-DD[THH:MM] returns the full NxN matrix at one instant;
+    ?start=&end=&step= returns a compact series (upper-triangle ``pairs`` and
+    one row of ``distances`` per time). Positions come from one batched
+    evaluation per body and the pairs from NumPy broadcasting.
+    """
+    try:
+        if request.GET.get('start') or request.GET.get('end'):
+            start = _parse_instant_utc(request.GET.get('start') or '')
+            end = _parse_instant_utc(request.GET.get('end') or '')
+        else:
+            start = _parse_instant_utc(request.GET['date']) if request.GET.get('date') else \
+                datetime.utcnow().replace(tzinfo=utc)
+            end = None
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid date. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM.'}, status=400)
+
+    step = None
+    if end is not None:
+        try:
+            step = _parse_step(request.GET.get('step') or '1d')
+        except ValueError:
+            return FastJsonResponse({'error': 'Invalid step. Use e.g. 1d, 6h or 30m (minimum 1m).'}, status=400)
+        if end < start:
+            return FastJsonResponse({'error': 'end must not be before start.'}, status=400)
+        if (end - start) / step + 1 > MAX_MATRIX_FRAMES:
+            return FastJsonResponse({'error': f'Too many samples (max {MAX_MATRIX_FRAMES}); use a larger step.'}, status=400)
+    span_days = 0.0 if end is None else (end - start) / timedelta(days=1)
+    if not _within_ephemeris(planets_distance.ts, planets_distance.bodies, start, span_days):
+        return FastJsonResponse({'error': 'Dates must stay inside the ephemeris range.'}, status=400)
+
+    if end is not None:
+        key = f'{start:%Y%m%dT%H%M%S}:{end:%Y%m%dT%H%M%S}:{int(step.total_seconds())}'
+    elif request.GET.get('date'):
+        key = f'{start:%Y%m%dT%H%M%S}'
     else:
-        selected_date = datetime.utcnow().replace(tzinfo=utc)
+        return FastJsonResponse(_distance_matrix_payload(start, None, None))
+
+    payload = tiered_cache.get_or_compute('distance-matrix', key, _distance_matrix_payload,
+                                          start, end, step, timeout=EPHEMERIS_CACHE_SECONDS)
+    return FastJsonResponse(payload)
 
+
+def _orbit_samples():
     ts, bodies = _get_skyfield()
-    t = ts.from_datetime(selected_date)
-    sun = bodies['sun']
+    planets = [
+        (name, _planet_sf_key(name), float(PLANET_FACTS[name]['year_length_earth_days']))
+        for name in PLANET_ORDER
+    ]
+    return orbit_paths.sample_paths(ts, bodies, planets)
 
-    # Upcoming Events should always be based on the current date/time when viewing the page,
-    # not on the user-selected orbit date.
-    events_date = datetime.utcnow().replace(tzinfo=utc)
-    t_events = ts.from_datetime(events_date)
 
-    planet_names = PLANET_ORDER
-    # Progressive radii: smaller gaps near center, increasing outward (geometric)
-    base = 60
-    growth = 1.35
-    raw_radii = [base * (growth ** i) for i in range(len(planet_names))]
-    # Scale radii so the outermost orbit nearly touches the SVG frame without overflowing.
-    svg_center = 800
-    margin = 40
-    max_allow = svg_center - margin
-    max_raw = max(raw_radii) if raw_radii else 1
-    scale = (max_allow / max_raw) if max_raw > 0 else 1
-    radii = [round(r * scale) for r in raw_radii]
-
-    sf_planets = {
-        'mercury': bodies['mercury'],
-        'venus': bodies['venus'],
-        'earth': bodies['earth'],
-        'mars': bodies['mars barycenter'],
-        'jupiter': bodies['jupiter barycenter'],
-        'saturn': bodies['saturn barycenter'],
-        'uranus': bodies['uranus barycenter'],
-        'neptune': bodies['neptune barycenter']
+def _orbit_paths_payload(lod: int):
+    # Every level is simplified from the same full-resolution samples.
+    samples = tiered_cache.get_or_compute('orbit-samples', 'all', _orbit_samples,
+                                          timeout=EPHEMERIS_CACHE_SECONDS)
+    return {
+        'frame': 'ecliptic J2000, heliocentric',
+        'unit': 'au',
+        'lod': lod,
+        'tolerance_fraction': orbit_paths.LOD_TOLERANCES[lod],
+        'paths': orbit_paths.build_paths(samples, lod),
     }
 
-    positions = {}
-    for i, name in enumerate(planet_names):
-        vec = sun.at(t).observe(sf_planets[name]).position.km
-        angle = math.atan2(vec[1], vec[0])
-        positions[name] = {
-            'radius': radii[i],
-            'angle': angle
-        }
 
-    periods = {
-        'mercury': 88,
-        'venus': 225,
-        'earth': 365,
-        'mars': 687,
-        'jupiter': 4333,
-        'saturn': 10759,
-        'uranus': 30687,
-        'neptune': 60190
+@require_GET
+def orbit_paths_api(request):
+    """True heliocentric orbit polylines over one period for each planet.
+
+    ?lod=0 is the full sampling; higher levels are simplified (Ramer-Douglas-Peucker)
+    with a tolerance relative to the orbit size. The ephemeris is sampled once
+    ('orbit-samples'); each level is derived from those samples and cached too.
+    """
+    try:
+        lod = int(request.GET.get('lod') or 2)
+    except ValueError:
+        lod = -1
+    if lod not in orbit_paths.LOD_TOLERANCES:
+        return FastJsonResponse({'error': f'lod must be one of {sorted(orbit_paths.LOD_TOLERANCES)}.'}, status=400)
+    payload = tiered_cache.get_or_compute('orbit-paths', f'lod{lod}', _orbit_paths_payload, lod,
+                                          timeout=EPHEMERIS_CACHE_SECONDS)
+    return FastJsonResponse(payload)
+
+
+def _parse_observer(params):
+    """(lat, lon) from ``lat``/``lon`` parameters, None when both are absent."""
+    lat, lon = params.get('lat'), params.get('lon')
+    if lat in (None, '') and lon in (None, ''):
+        return None
+    if lat in (None, '') or lon in (None, ''):
+        raise ValueError('lat and lon go together')
+    lat, lon = float(lat), float(lon)
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise ValueError('observer out of range')
+    return lat, lon
+
+
+MAX_METEOR_SHOWERS = len(meteor_showers.SHOWER_CATALOG)
+
+
+def _meteor_showers_payload(day: datetime, count: int, observer):
+    on = day.date()
+    upcoming = meteor_showers.upcoming(on, count)
+    active = meteor_showers.active(on)
+    if observer is not None:
+        ts, bodies = _get_skyfield()
+        # Showers both active and upcoming share one visibility computation.
+        unique = {e['code']: e for e in upcoming + active}
+        # A peak night (local noon to noon) falls within two days of the peak date;
+        # nights the kernel does not cover get no visibility.
+        covered = []
+        for entry in unique.values():
+            peak = datetime.strptime(entry['peak'], '%Y-%m-%d').replace(tzinfo=utc)
+            if _within_ephemeris(ts, bodies, peak, 2.0):
+                covered.append(entry)
+            else:
+                entry['visibility'] = None
+        meteor_showers.radiant_visibility(ts, bodies, covered, *observer)
+        upcoming = [unique[e['code']] for e in upcoming]
+        active = [unique[e['code']] for e in active]
+    return {
+        'date': on.isoformat(),
+        'observer': {'lat': observer[0], 'lon': observer[1]} if observer else None,
+        'night_sun_altitude_deg': meteor_showers.NIGHT_SUN_ALTITUDE,
+        'active': active,
+        'upcoming': upcoming,
     }
 
-    # --- Upcoming events (best-effort) ---
-    # 1) Next New/Full moon (possible eclipse candidate)
-    upcoming = {
-        'eclipse': None,
-        'meteor_shower': None,
-        'comet': None,
-        'visible_planets': [],
+
+@require_GET
+def meteor_showers_api(request):
+    """Active and next meteor showers from the bundled catalog.
+
+    ?date=YYYY-MM-DD (default today), ?count=N upcoming peaks (default 5).
+    With ?lat=&lon= each shower also gets its radiant altitude over the
+    peak night for that observer (``visibility`` is null when that night is
+    outside the ephemeris). Observers are rounded to 0.1 degree so nearby
+    requests share cache entries.
+    """
+    try:
+        day = _parse_date_utc(request.GET.get('date'))
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid date. Use YYYY-MM-DD.'}, status=400)
+    try:
+        count = int(request.GET.get('count') or 5)
+    except ValueError:
+        count = 0
+    if not 1 <= count <= MAX_METEOR_SHOWERS:
+        return FastJsonResponse({'error': f'count must be between 1 and {MAX_METEOR_SHOWERS}.'}, status=400)
+    try:
+        observer = _parse_observer(request.GET)
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid observer. Use lat in [-90, 90] and lon in [-180, 180].'}, status=400)
+
+    day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    key = f'{day:%Y-%m-%d}:{count}'
+    if observer is not None:
+        observer = (round(observer[0], 1), round(observer[1], 1))
+        key += f':{observer[0]:.1f},{observer[1]:.1f}'
+    payload = tiered_cache.get_or_compute('meteor-showers', key, _meteor_showers_payload,
+                                          day, count, observer, timeout=EPHEMERIS_CACHE_SECONDS)
+    return FastJsonResponse(payload)
+
+
+MAX_TONIGHT_OBSERVERS = 1000
+
+
+def _tonight_payload(day: datetime, lats, lons):
+    ts, bodies = _get_skyfield()
+    planets = [(name, _planet_sf_key(name)) for name in PLANET_ORDER if name != 'earth']
+    return tonight.evening_sky(ts, bodies, planets, lats, lons, day)
+
+
+@csrf_exempt
+@require_POST
+def tonight_batch_api(request):
+    """Planets above the horizon at dusk for a batch of observers.
+
+    POST a JSON body ``{"date": "YYYY-MM-DD", "observers": [{"id": ..., "lat": ..., "lon": ...}]}``
+    (``date`` defaults to today, ``id`` is optional and echoed back). All
+    observers are computed together; see planets.tonight. Observers are
+    rounded to 0.01 degree and the whole batch is cached, so a partner
+    polling the same city list is served from the cache.
+    """
+    try:
+        body = json.loads(request.body or b'{}')
+        observers = body['observers']
+        if not isinstance(observers, list):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return FastJsonResponse({'error': 'Expected a JSON object with an "observers" list.'}, status=400)
+    if not 1 <= len(observers) <= MAX_TONIGHT_OBSERVERS:
+        return FastJsonResponse({'error': f'observers must hold between 1 and {MAX_TONIGHT_OBSERVERS} entries.'}, status=400)
+    try:
+        day = _parse_date_utc(body.get('date'))
+    except (ValueError, TypeError):
+        return FastJsonResponse({'error': 'Invalid date. Use YYYY-MM-DD.'}, status=400)
+
+    lats, lons = [], []
+    for i, item in enumerate(observers):
+        try:
+            lat, lon = _parse_observer(item)
+        except (ValueError, TypeError, AttributeError):
+            return FastJsonResponse({'error': f'Invalid observer at index {i}. Use lat in [-90, 90] and lon in [-180, 180].'}, status=400)
+        lats.append(round(lat, 2))
+        lons.append(round(lon, 2))
+
+    day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    ts, bodies = _get_skyfield()
+    if not _within_ephemeris(ts, bodies, day, tonight.GRID_HOURS / 24.0):
+        return FastJsonResponse({'error': 'date must be inside the ephemeris range.'}, status=400)
+    digest = hashlib.sha1(encoding.dumps_json_bytes([lats, lons])).hexdigest()
+    results = tiered_cache.get_or_compute('tonight', f'{day:%Y-%m-%d}:{digest}', _tonight_payload,
+                                          day, lats, lons, timeout=EPHEMERIS_CACHE_SECONDS)
+    return FastJsonResponse({
+        'date': day.strftime('%Y-%m-%d'),
+        'dusk_sun_altitude_deg': tonight.DUSK_SUN_ALTITUDE,
+        'observers': [
+            {'id': item.get('id'), 'lat': lat, 'lon': lon, **result}
+            for item, lat, lon, result in zip(observers, lats, lons, results)
+        ],
+    })
+
+
+SKY_TIME_BUCKET_SECONDS = 300
+
+
+def _sky_bodies():
+    return [('sun', 'sun'), ('moon', 'moon')] + [
+        (name, _planet_sf_key(name)) for name in PLANET_ORDER if name != 'earth'
+    ]
+
+
+def _sky_radec_payload(when: datetime):
+    """Geocentric apparent RA/Dec of date of the Sun, Moon, planets and catalog stars."""
+    ts, bodies = _get_skyfield()
+    t = ts.from_datetime(when)
+    earth = bodies['earth']
+    body_ra, body_dec = [], []
+    for _, sf_key in _sky_bodies():
+        ra, dec, _ = earth.at(t).observe(bodies[sf_key]).apparent().radec(epoch='date')
+        body_ra.append(ra._degrees)
+        body_dec.append(dec.degrees)
+    star_ra, star_dec = bright_stars.apparent_radec(earth, t, bright_stars.catalog())
+    return {
+        'bodies': {'ra_deg': body_ra, 'dec_deg': body_dec},
+        'stars': {'ra_deg': star_ra, 'dec_deg': star_dec},
     }
 
+
+@require_GET
+def sky_api(request):
+    """Apparent sky positions: Sun, Moon, planets and the bundled bright stars.
+
+    ?time=YYYY-MM-DD[THH:MM[:SS]] UTC (default now). RA/Dec are computed once
+    per SKY_TIME_BUCKET_SECONDS bucket (``radec_time``) and cached; they move
+    little in that time. With ?lat=&lon= alt/az are added for the requested
+    time itself (planets.sky.altaz with that instant's sidereal time; the Moon
+    is corrected for parallax). ?mag= limits stars to that magnitude.
+    """
+    try:
+        when = _parse_instant_utc(request.GET['time']) if request.GET.get('time') else datetime.utcnow().replace(tzinfo=utc)
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid time. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS].'}, status=400)
+    try:
+        observer = _parse_observer(request.GET)
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid observer. Use lat in [-90, 90] and lon in [-180, 180].'}, status=400)
+    try:
+        mag_limit = float(request.GET['mag']) if request.GET.get('mag') else None
+    except ValueError:
+        return FastJsonResponse({'error': 'Invalid mag.'}, status=400)
+
+    epoch = int(when.timestamp())
+    bucket = datetime.fromtimestamp(epoch - epoch % SKY_TIME_BUCKET_SECONDS, tz=utc)
+    ts, bodies = _get_skyfield()
+    if not _within_ephemeris(ts, bodies, bucket, SKY_TIME_BUCKET_SECONDS / 86400.0):
+        return FastJsonResponse({'error': 'time must be inside the ephemeris range.'}, status=400)
+    radec = tiered_cache.get_or_compute('sky', f'{bucket:%Y%m%dT%H%M}', _sky_radec_payload, bucket,
+                                        timeout=EPHEMERIS_CACHE_SECONDS)
+
+    names = [name for name, _ in _sky_bodies()]
+    body_ra = np.asarray(radec['bodies']['ra_deg'])
+    body_dec = np.asarray(radec['bodies']['dec_deg'])
+    catalog = bright_stars.catalog()
+    keep = np.ones(len(catalog), dtype=bool) if mag_limit is None else np.asarray(catalog['vmag']) <= mag_limit
+    star_ra = np.asarray(radec['stars']['ra_deg'])[keep]
+    star_dec = np.asarray(radec['stars']['dec_deg'])[keep]
+
+    payload = {
+        'time': when.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'radec_time': bucket.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'bucket_seconds': SKY_TIME_BUCKET_SECONDS,
+        'frame': 'apparent, true equator and equinox of date (geocentric)',
+        'observer': {'lat': observer[0], 'lon': observer[1]} if observer else None,
+        'bodies': [
+            {'name': name, 'ra_deg': round(float(ra), 4), 'dec_deg': round(float(dec), 4)}
+            for name, ra, dec in zip(names, body_ra, body_dec)
+        ],
+        'stars': {
+            'name': np.asarray(catalog['name'])[keep].tolist(),
+            'vmag': np.round(np.asarray(catalog['vmag'])[keep].astype(float), 2),
+            'ra_deg': np.round(star_ra, 4),
+            'dec_deg': np.round(star_dec, 4),
+        },
+    }
+    if observer is not None:
+        lat, lon = observer
+        # The Earth turns 1.25 degrees in a bucket, so use the sidereal time of the request.
+        t = ts.from_datetime(when)
+        gast = float(t.gast)
+        alt, az = sky.altaz(body_ra, body_dec, lat, lon, gast)
+        # The Moon's parallax reaches a degree, so use a topocentric position for it.
+        topo = (bodies['earth'] + wgs84.latlon(lat, lon)).at(t)
+        moon_alt, moon_az, _ = topo.observe(bodies['moon']).apparent().altaz()
+        i = names.index('moon')
+        alt[i], az[i] = moon_alt.degrees, moon_az.degrees
+        for entry, a, z in zip(payload['bodies'], alt, az):
+            entry['alt_deg'] = round(float(a), 3)
+            entry['az_deg'] = round(float(z), 3)
+        star_alt, star_az = sky.altaz(star_ra, star_dec, lat, lon, gast)
+        payload['stars']['alt_deg'] = np.round(star_alt, 3)
+        payload['stars']['az_deg'] = np.round(star_az, 3)
+    return FastJsonResponse(payload)
+
+
+def _find_moon_phase_entry(events_from: datetime):
+    """Nearest New/Full moon within a year of ``events_from``."""
+    ts, bodies = _get_skyfield()
     # search window: 1 year
-    t0 = t_events
-    t1 = ts.from_datetime((events_date + timedelta(days=365)))
+    t0 = ts.from_datetime(events_from)
+    t1 = ts.from_datetime(events_from + timedelta(days=365))
 
-    # Find the nearest New/Full moon (for info) but prefer the NASA eclipse catalog for definitive events.
-    phase_entry = None
     try:
         phases = almanac.moon_phases(bodies)
         ts_ph, ev_ph = almanac.find_discrete(t0, t1, phases)
         phase_map = {0: 'New Moon', 1: 'First Quarter', 2: 'Full Moon', 3: 'Last Quarter'}
         for tt, ev in zip(ts_ph, ev_ph):
             if ev in (0, 2):
-                phase_entry = {
+                return {
                     'date': tt.utc_datetime().strftime('%Y-%m-%d'),
                     'type': phase_map.get(ev, 'Moon phase'),
                     'note': 'Nearest Moon phase (not an eclipse)'
                 }
-                break
     except Exception:
-        phase_entry = {'date': None, 'type': None, 'note': 'Could not compute moon phases.'}
+        return {'date': None, 'type': None, 'note': 'Could not compute moon phases.'}
+    return None
 
-    # Prefer NASA GSFC eclipse catalog (definitive). If catalog finds none, report explicitly.
-    try:
-        catalog_e = _get_next_eclipse_from_catalog(events_date)
-    except Exception:
-        catalog_e = None
 
-    if catalog_e:
-        upcoming['eclipse'] = catalog_e
-    else:
-        # No catalog eclipse: explicitly state none predicted and show nearest moon phase for context
-        if phase_entry and phase_entry.get('date'):
-            upcoming['eclipse'] = {
-                'date': None,
-                'type': None,
-                'note': f'No eclipse predicted (NASA GSFC). Nearest Moon phase: {phase_entry["date"]} — {phase_entry["type"]}.'
-            }
-        else:
-            upcoming['eclipse'] = {'date': None, 'type': None, 'note': 'No eclipse predicted (NASA GSFC).'}
-
-    # 2) Next meteor shower from a small static list (peak dates)
-    showers = [
-        ('Quadrantids', (1, 3)),
-        ('Lyrids', (4, 22)),
-        ('Eta Aquariids', (5, 6)),
-        ('Perseids', (8, 12)),
-        ('Orionids', (10, 21)),
-        ('Leonids', (11, 17)),
-        ('Geminids', (12, 14)),
-        ('Ursids', (12, 22)),
+def _discover_comet_candidates_from_sbdb():
+    # Best-effort: try multiple known SBDB endpoints with flexible parsing.
+    endpoints = [
+        'https://ssd-api.jpl.nasa.gov/sbdb.api?body_type=COMET&limit=50',
+        'https://ssd-api.jpl.nasa.gov/sbdb_query.api?body_type=COMET&limit=50',
+        'https://ssd-api.jpl.nasa.gov/sbdb.api?object_type=COMET&limit=50',
     ]
-    sd = events_date
-    found_shower = None
-    for name, (m, d) in showers:
-        cand = datetime(sd.year, m, d)
-        if cand.replace(tzinfo=utc) < events_date:
-            cand = datetime(sd.year + 1, m, d)
-        if not found_shower or cand < found_shower[1]:
-            found_shower = (name, cand)
-    if found_shower:
-        upcoming['meteor_shower'] = {'name': found_shower[0], 'date': found_shower[1].strftime('%Y-%m-%d')}
-
-    # 3) Comet: placeholder (requires external catalog)
-    # Try to discover candidate comets from JPL SBDB (REST) and then query Horizons for the best one.
-    def _discover_comet_candidates_from_sbdb():
-        # Best-effort: try multiple known SBDB endpoints with flexible parsing.
-        endpoints = [
-            'https://ssd-api.jpl.nasa.gov/sbdb.api?body_type=COMET&limit=50',
-            'https://ssd-api.jpl.nasa.gov/sbdb_query.api?body_type=COMET&limit=50',
-            'https://ssd-api.jpl.nasa.gov/sbdb.api?object_type=COMET&limit=50',
-        ]
-        for url in endpoints:
-            try:
-                data = _fetch_json_url(url, timeout=8.0)
-            except Exception:
-                continue
-            # Flexible extraction: look for a list of objects in common keys
-            candidates = []
-            if isinstance(data, dict):
-                # Common shapes: {'data': [...]} or {'objects': [...]} or root list
-                for key in ('data', 'objects', 'results', 'body'):
-                    if key in data and isinstance(data[key], list):
-                        items = data[key]
-                        break
-                else:
-                    # maybe the API returned a list at the root
-                    items = data.get('fields') if 'fields' in data else []
-                if not isinstance(items, list):
-                    items = []
-                for it in items:
-                    if isinstance(it, dict):
-                        # try common name keys
-                        name = it.get('full_name') or it.get('fullname') or it.get('des') or it.get('object_name') or it.get('designation')
-                        if name:
-                            candidates.append(name)
-            elif isinstance(data, list):
-                for it in data:
-                    if isinstance(it, dict):
-                        name = it.get('full_name') or it.get('designation') or it.get('des')
-                        if name:
-                            candidates.append(name)
-            if candidates:
-                return candidates
-        return []
-
+    for url in endpoints:
+        try:
+            data = _fetch_json_url(url, timeout=8.0)
+        except Exception:
+            continue
+        # Flexible extraction: look for a list of objects in common keys
+        candidates = []
+        if isinstance(data, dict):
+            # Common shapes: {'data': [...]} or {'objects': [...]} or root list
+            for key in ('data', 'objects', 'results', 'body'):
+                if key in data and isinstance(data[key], list):
+                    items = data[key]
+                    break
+            else:
+                # maybe the API returned a list at the root
+                items = data.get('fields') if 'fields' in data else []
+            if not isinstance(items, list):
+                items = []
+            for it in items:
+                if isinstance(it, dict):
+                    # try common name keys
+                    name = it.get('full_name') or it.get('fullname') or it.get('des') or it.get('object_name') or it.get('designation')
+                    if name:
+                        candidates.append(name)
+        elif isinstance(data, list):
+            for it in data:
+                if isinstance(it, dict):
+                    name = it.get('full_name') or it.get('designation') or it.get('des')
+                    if name:
+                        candidates.append(name)
+        if candidates:
+            return candidates
+    return []
+
+
+def _pick_comet(events_day: datetime):
+    """Brightest comet candidate for ``events_day`` (SBDB discovery + JPL Horizons)."""
     candidates = []
     try:
-        candidates = _discover_comet_candidates_from_sbdb()
+        candidates = single_flight('sbdb-comet-candidates', _discover_comet_candidates_from_sbdb)
     except Exception:
         candidates = []
 
@@ -590,23 +1032,21 @@ def orbits(request):
         # Convert discovered names to tuple format (name, name) for uniform handling
         candidates = [(c, c) for c in candidates]
 
-    if not ASTROQUERY_AVAILABLE:
-        upcoming['comet'] = {'name': None, 'note': 'astroquery not installed; Horizons lookup unavailable'}
+    if not upstream.horizons_available():
+        return {'name': None, 'note': 'astroquery not installed; Horizons lookup unavailable'}
     else:
         best = None
         horizon_errors = []
         try:
-            date_start = events_date.strftime('%Y-%m-%d')
-            date_end = (events_date + timedelta(days=1)).strftime('%Y-%m-%d')
+            date_start = events_day.strftime('%Y-%m-%d')
+            date_end = (events_day + timedelta(days=1)).strftime('%Y-%m-%d')
             for display_name, horizons_id in candidates:
                 try:
-                    obj = Horizons(id=horizons_id, location='500@399', epochs={'start': date_start, 'stop': date_end, 'step': '1d'})
-                    ephem = obj.ephemerides()
-                    if ephem is None or len(ephem) == 0:
+                    row = upstream.horizons_ephemeris_row(horizons_id, '500@399', date_start, date_end, '1d')
+                    if not row:
                         horizon_errors.append(f"{display_name}: no ephemeris data")
                         continue
-                    row = ephem[0]
-                    cols = row.colnames if hasattr(row, 'colnames') else []
+                    cols = row.keys()
                     # extract magnitude: comets use Tmag (total) or Nmag (nuclear)
                     mag = None
                     for col in ('Tmag', 'Nmag', 'V', 'Vmag', 'mag'):
@@ -650,7 +1090,7 @@ def orbits(request):
             horizon_errors.append(f'general horizons query failed: {str(e)[:40]}')
 
         if best:
-            upcoming['comet'] = {
+            return {
                 'name': best.get('designation'),
                 'estimated_mag': best.get('mag'),
                 'elongation_deg': best.get('elong'),
@@ -660,7 +1100,89 @@ def orbits(request):
             note = 'No comets found via Horizons'
             if horizon_errors:
                 note += ' — ' + '; '.join(horizon_errors[:3])
-            upcoming['comet'] = {'name': None, 'note': note}
+            return {'name': None, 'note': note}
+
+
+COMET_CACHE_SECONDS = 6 * 3600
+# A failed lookup (SBDB/Horizons outage) is retried soon instead of sticking for hours.
+COMET_RETRY_SECONDS = 300
+
+
+def _comet_cache_timeout(result):
+    return COMET_CACHE_SECONDS if result and result.get('name') else COMET_RETRY_SECONDS
+
+
+def orbits(request):
+    # Procesar la fecha seleccionada
+    date_str = request.GET.get('date')
+    if date_str:
+        selected_date = datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=utc)
+    else:
+        selected_date = datetime.utcnow().replace(tzinfo=utc)
+
+    ts, bodies = _get_skyfield()
+    sun = bodies['sun']
+
+    # Upcoming Events should always be based on the current date/time when viewing the page,
+    # not on the user-selected orbit date.
+    events_date = datetime.utcnow().replace(tzinfo=utc)
+    t_events = ts.from_datetime(events_date)
+
+    radii = _schematic_radii()
+    positions = _positions_dict(radii, _heliocentric_angles(ts, bodies, [selected_date])[0])
+
+    periods = {
+        'mercury': 88,
+        'venus': 225,
+        'earth': 365,
+        'mars': 687,
+        'jupiter': 4333,
+        'saturn': 10759,
+        'uranus': 30687,
+        'neptune': 60190
+    }
+
+    # --- Upcoming events (best-effort) ---
+    # 1) Next New/Full moon (possible eclipse candidate)
+    upcoming = {
+        'eclipse': None,
+        'meteor_shower': None,
+        'comet': None,
+        'visible_planets': [],
+    }
+
+    # Find the nearest New/Full moon (for info) but prefer the NASA eclipse catalog for definitive events.
+    # One search per hour, shared across requests and instances (see planets.caching).
+    events_hour = events_date.replace(minute=0, second=0, microsecond=0)
+    phase_entry = tiered_cache.get_or_compute('moon-phase', f'{events_hour:%Y-%m-%dT%H}',
+                                              _find_moon_phase_entry, events_hour, timeout=3600)
+
+    # Prefer NASA GSFC eclipse catalog (definitive). If catalog finds none, report explicitly.
+    try:
+        catalog_e = _get_next_eclipse_from_catalog(events_date)
+    except Exception:
+        catalog_e = None
+
+    if catalog_e:
+        upcoming['eclipse'] = catalog_e
+    else:
+        # No catalog eclipse: explicitly state none predicted and show nearest moon phase for context
+        if phase_entry and phase_entry.get('date'):
+            upcoming['eclipse'] = {
+                'date': None,
+                'type': None,
+                'note': f'No eclipse predicted (NASA GSFC). Nearest Moon phase: {phase_entry["date"]} — {phase_entry["type"]}.'
+            }
+        else:
+            upcoming['eclipse'] = {'date': None, 'type': None, 'note': 'No eclipse predicted (NASA GSFC).'}
+
+    # 2) Next meteor shower peak from the bundled catalog (see planets.meteor_showers)
+    upcoming['meteor_shower'] = meteor_showers.next_peak(events_date)
+
+    # 3) Comet: discover candidates from JPL SBDB (REST) and then query Horizons for the best one.
+    events_day = events_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    upcoming['comet'] = tiered_cache.get_or_compute('comet', f'{events_day:%Y-%m-%d}',
+                                                    _pick_comet, events_day, timeout=_comet_cache_timeout)
 
     # 4) Visible planets by elongation (angle between planet and Sun as seen from Earth)
     visible = []
@@ -688,12 +1210,12 @@ def orbits(request):
     upcoming['visible_planets'] = visible
 
     return render(request, 'planets/orbits.html', {
-        'positions_json': json.dumps(positions),
-        'periods_json': json.dumps(periods),
+        'positions_json': encoding.dumps_json(positions),
+        'periods_json': encoding.dumps_json(periods),
         'selected_date': selected_date.strftime('%Y-%m-%d'),
         'radii_list': radii,
         'upcoming_events': upcoming,
-        'upcoming_json': json.dumps(upcoming),
+        'upcoming_json': encoding.dumps_json(upcoming),
         'debug': getattr(settings, 'DEBUG', False),
     })
 
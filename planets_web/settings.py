@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,6 +60,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'planets.middleware.ApiCompressionMiddleware',
+    'planets.middleware.RequestProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -100,6 +105,54 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Meant to be shared between serverless instances so expensive results survive
+# cold starts (planets/caching.py keeps a small in-process LRU in front of it).
+# Select the backend with PLANETS_CACHE_URL:
+#   redis://host:6379/0  -> any Redis-compatible server (uses the redis package)
+#   file:///some/dir     -> file-based store (default: <tmp>/planets-cache)
+#   locmem://            -> per-process memory only
+#
+# On Vercel (and most serverless hosts) the temp directory belongs to a single
+# instance, so the default file store is NOT shared: each instance warms its
+# own copy. Set PLANETS_CACHE_URL to a Redis URL in production. The tiered
+# cache treats backend errors as misses, so an unreachable server only shows
+# up as slow responses, not as errors.
+PLANETS_CACHE_URL = os.environ.get("PLANETS_CACHE_URL", "")
+
+if PLANETS_CACHE_URL.startswith(("redis://", "rediss://")):
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("PLANETS_CACHE_URL is a Redis URL but the redis package is not installed.")
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": PLANETS_CACHE_URL,
+        }
+    }
+elif PLANETS_CACHE_URL.startswith("locmem://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": PLANETS_CACHE_URL.removeprefix("file://")
+            or os.path.join(tempfile.gettempdir(), "planets-cache"),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+PLANETS_CACHE_LOCAL_SIZE = int(os.environ.get("PLANETS_CACHE_LOCAL_SIZE", "256"))
+PLANETS_CACHE_LOCAL_TTL = int(os.environ.get("PLANETS_CACHE_LOCAL_TTL", "300"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -138,7 +191,51 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
 # Serve static files in production (including Vercel serverless).
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Content-hashed names let whitenoise send far-future immutable cache headers;
+# the planets storage also emits WebP copies of the planet sprites.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "planets.storage.OptimizedStaticFilesStorage",
+    },
+}
+
+# Sprites re-encoded as lossless WebP during collectstatic (needs Pillow).
+PLANETS_WEBP_SOURCES = ('planets/gifs/*.gif', 'planets/gifs/*.png')
+
+# Pre-rendered API payloads written by `manage.py export_ephemeris` live under
+# static/ephemeris/<version>/ and never change once written; only index.json
+# (which names the current version) must stay fresh.
+def _ephemeris_static_headers(headers, path, url):
+    if url.startswith(STATIC_URL + "ephemeris/"):
+        if url.endswith("/index.json"):
+            headers["Cache-Control"] = "public, max-age=300"
+        else:
+            headers["Cache-Control"] = "public, max-age=31536000, s-maxage=31536000, immutable"
+
+
+WHITENOISE_ADD_HEADERS_FUNCTION = _ephemeris_static_headers
+
+# Dynamic API responses (JSON / packed positions) above this size are
+# compressed by planets.middleware.ApiCompressionMiddleware.
+PLANETS_COMPRESS_MIN_BYTES = int(os.environ.get("PLANETS_COMPRESS_MIN_BYTES", "1024"))
+
+# External services (NOAA SWPC, JPL SBDB/Horizons): live, record, replay or
+# standin. See planets/upstream.py; replay/standin make load tests offline.
+PLANETS_UPSTREAM_MODE = os.environ.get("PLANETS_UPSTREAM_MODE", "live")
+PLANETS_UPSTREAM_FIXTURES = os.environ.get("PLANETS_UPSTREAM_FIXTURES", str(BASE_DIR / "upstream_fixtures"))
+PLANETS_UPSTREAM_STANDIN_URL = os.environ.get("PLANETS_UPSTREAM_STANDIN_URL", "http://127.0.0.1:8765")
+
+# Opt-in cProfile sampling (planets/profiling.py). Requests carrying a signed
+# X-Planets-Profile token (`manage.py profiler_token`) are always profiled.
+PLANETS_PROFILER_ENABLED = os.environ.get("PLANETS_PROFILER_ENABLED", "0") == "1"
+PLANETS_PROFILER_SAMPLE_RATE = float(os.environ.get("PLANETS_PROFILER_SAMPLE_RATE", "0.01"))
+PLANETS_PROFILER_KEEP = int(os.environ.get("PLANETS_PROFILER_KEEP", "20"))
+PLANETS_PROFILER_DIR = os.environ.get("PLANETS_PROFILER_DIR") or None
+# Signs profiler tokens; unset disables token-triggered profiling and /api/profiles/.
+PLANETS_PROFILER_SECRET = os.environ.get("PLANETS_PROFILER_SECRET") or None
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field